@@ -2,25 +2,22 @@ import streamlit as st
 
 
 def handle_practice_navigation() -> bool:
-    if st.session_state.get("start_practice", False):
-        st.session_state.start_practice = False
+    state = st.session_state
+    query_params = st.query_params
+    if state.get("start_practice", False):
+        state.start_practice = False
 
-        selected_round = st.session_state.get("round_radio", "Coding")
-        selected_difficulty = st.session_state.get("difficulty_radio", "Professional")
-        role = st.session_state.get("role", "Software Engineer")
-        company = st.session_state.get("company", "")
-
-        params = dict(st.query_params)
-        params.update(
-            {
-                "page": "practice",
-                "round": selected_round,
-                "difficulty": selected_difficulty,
-                "role": role,
-                "company": company,
-            }
+        already_practicing = query_params.get("page") == "practice"
+        query_params.update(
+            page="practice",
+            round=state.get("round_radio", "Coding"),
+            difficulty=state.get("difficulty_radio", "Professional"),
+            role=state.get("role", "Software Engineer"),
+            company=state.get("company", ""),
         )
-        st.query_params.update(**params)
-        st.rerun()
+        # Only force a rerun when we are actually switching pages
+        if not already_practicing:
+            st.rerun()
+        return True
 
-    return st.query_params.get("page") == "practice"
+    return query_params.get("page") == "practice"
@@ -1,19 +1,27 @@
+import functools
+import hashlib
+import logging
 import os
-from typing import Optional, Dict, Any, List, Tuple
+import re
+import types
+from typing import Optional, Dict, Any, Iterator, List, Mapping, Tuple
 
 import google.generativeai as genai
+import streamlit as st
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 from prompt_strategies import get_prompt_by_strategy, get_available_strategies
 
+_log = logging.getLogger(__name__)
+
 DEFAULT_GEMINI_MODEL = "gemini-2.5-pro"
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", DEFAULT_GEMINI_MODEL)
 
-DEFAULT_GENERATION_CONFIG: dict[str, float | int] = {
+DEFAULT_GENERATION_CONFIG: Mapping[str, float | int] = types.MappingProxyType({
     "temperature": 0.75,
     "top_p": 0.9,
     "top_k": 40,
     "max_output_tokens": 3000,  # Increased from 2048 to handle longer responses
-}
+})
 
 # Default safety settings - block medium or higher probability of unsafe content
 DEFAULT_SAFETY_SETTINGS = {
@@ -23,44 +31,120 @@ DEFAULT_SAFETY_SETTINGS = {
     HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
 }
 
+# API key the SDK's default client is currently configured with
+_CONFIGURED_KEY: Optional[str] = None
+
+# Common prefixes that LLMs sometimes put in front of the question
+_QUESTION_PREFIXES = (
+    "**Question:**",
+    "**Question**:",
+    "Question:",
+    "**Q:**",
+    "Q:",
+    "Interview Question:",
+    "**Interview Question:**",
+)
+_MAX_PREFIX_LEN = max(len(prefix) for prefix in _QUESTION_PREFIXES)
+_PREFIX_RE = re.compile(r"^(?:%s)\s*" % "|".join(map(re.escape, _QUESTION_PREFIXES)))
 
 
 def _merge_generation_config(
     overrides: Optional[dict[str, float | int]] = None,
-) -> dict[str, float | int]:
+) -> Mapping[str, float | int]:
+    if not overrides:
+        return DEFAULT_GENERATION_CONFIG
     config = DEFAULT_GENERATION_CONFIG.copy()
-    if overrides:
-        for key, value in overrides.items():
-            if value is not None:
-                config[key] = value
+    for key, value in overrides.items():
+        if value is not None:
+            config[key] = value
     return config
 
 
-def _extract_text_from_candidate(candidate) -> str:
+def ensure_configured(api_key: str) -> None:
+    # genai.configure rebuilds the SDK's default client, so only do it when the key changes.
+    global _CONFIGURED_KEY
+    if _CONFIGURED_KEY != api_key:
+        genai.configure(api_key=api_key)
+        _CONFIGURED_KEY = api_key
+
+
+def api_key_fingerprint(api_key: str) -> str:
+    # Stands in for the key wherever one has to be part of a cache key
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+@functools.lru_cache(maxsize=64)
+def _get_model(
+    api_key_fingerprint: str,
+    model_name: str,
+    config_key: Tuple[Tuple[str, float | int], ...],
+    safety_key: Tuple[Tuple[Any, Any], ...],
+    system_instruction: Optional[str] = None,
+) -> genai.GenerativeModel:
+    # Cached per (key fingerprint, model, config, safety, instruction) so Streamlit
+    # reruns reuse the same model. The model picks up the key from the client
+    # ensure_configured set up; only its fingerprint is part of the cache key.
+    # A plain lru_cache rather than st.cache_resource: practice questions are
+    # also generated on worker threads that have no ScriptRunContext.
+    return genai.GenerativeModel(
+        model_name=model_name,
+        generation_config=dict(config_key),
+        safety_settings=dict(safety_key),
+        system_instruction=system_instruction,
+    )
+
+
+def _resolve_model(
+    api_key: str,
+    generation_config: Optional[dict[str, float | int]] = None,
+    safety_settings: Optional[dict] = None,
+    system_instruction: Optional[str] = None,
+) -> genai.GenerativeModel:
+    ensure_configured(api_key)
+    effective_config = _merge_generation_config(generation_config)
+    effective_safety = safety_settings or DEFAULT_SAFETY_SETTINGS
+    return _get_model(
+        api_key_fingerprint(api_key),
+        GEMINI_MODEL,
+        tuple(sorted(effective_config.items())),
+        tuple(sorted(effective_safety.items())),
+        system_instruction,
+    )
+
+
+def _join_candidate_parts(candidate) -> str:
     content = getattr(candidate, "content", None)
-    if not content:
-        return ""
+    parts = getattr(content, "parts", None) or []
+    return "".join(part.text for part in parts if getattr(part, "text", None))
+
+
+def _extract_text_from_candidate(candidate) -> str:
+    return _join_candidate_parts(candidate).strip()
 
 
 def _extract_text_from_response(response) -> str:
     if not response:
         return ""
-    try:
-        quick_text = getattr(response, "text", None)
-        if quick_text:
-            text_value = quick_text.strip()
-            if text_value:
-                return text_value
-    except ValueError:
-        # Gemini raises when no valid Part exists—fall back to manual parsing.
-        pass
-
+    # Walk the candidates first: plain attribute access, no exception when a
+    # response is empty or blocked.
     candidates = getattr(response, "candidates", None) or []
     for candidate in candidates:
         candidate_text = _extract_text_from_candidate(candidate)
         if candidate_text:
             return candidate_text
-    return ""
+
+    try:
+        quick_text = getattr(response, "text", None)
+    except ValueError:
+        # Gemini raises when no valid Part exists.
+        return ""
+    return quick_text.strip() if quick_text else ""
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _validate_key_once(api_key_hash: str, model_name: str, _model: genai.GenerativeModel) -> None:
+    # Only the key hash and model name form the cache key; failures raise and are not cached.
+    _model.count_tokens("ping")
 
 
 def validate_google_api_key(
@@ -72,16 +156,8 @@ def validate_google_api_key(
         raise ValueError("GOOGLE_API_KEY missing. Provide it via .env before generating questions.")
 
     try:
-        genai.configure(api_key=api_key)
-        effective_config = _merge_generation_config(generation_config)
-
-        effective_safety = safety_settings or DEFAULT_SAFETY_SETTINGS
-        model = genai.GenerativeModel(
-            model_name=GEMINI_MODEL,
-            generation_config=effective_config,
-            safety_settings=effective_safety,
-        )
-        model.count_tokens("ping")
+        model = _resolve_model(api_key, generation_config, safety_settings)
+        _validate_key_once(api_key_fingerprint(api_key), GEMINI_MODEL, model)
     except Exception as exc:
         raise RuntimeError(f"GOOGLE_API_KEY validation failed: {exc}") from exc
 
@@ -96,120 +172,187 @@ def generate_question(
     generation_config: Optional[dict[str, float | int]] = None,
     safety_settings: Optional[dict] = None,
     prompt_strategy: str = "chain_of_thought",
+    question_slot: Optional[Tuple[int, int]] = None,
 ) -> str:
-    # Debug: Print the API key status (first few characters for security)
-    print(f"API Key provided: {'Yes' if api_key else 'No'}")
+    # Debug: Log the API key status (first few characters for security)
+    _log.debug("API Key provided: %s", "Yes" if api_key else "No")
     if api_key:
-        print(f"API Key starts with: {api_key[:5]}...")
+        _log.debug("API Key starts with: %s...", api_key[:5])
 
     if not api_key:
         raise ValueError("GOOGLE_API_KEY missing. Please provide it via the .env file or settings.")
 
     # Generate using Gemini
     try:
-        # Configure the API
-        genai.configure(api_key=api_key)
-        effective_config = _merge_generation_config(generation_config)
-        effective_safety = safety_settings or DEFAULT_SAFETY_SETTINGS
-        
-        # Initialize the model
-        model = genai.GenerativeModel(
-            model_name=GEMINI_MODEL,
-            generation_config=effective_config,
-            safety_settings=effective_safety,
-        )
-        
         # Prepare the prompt using the selected strategy
-        print(f"Using prompt strategy: {prompt_strategy}")
-        prompt = get_prompt_by_strategy(
+        _log.debug("Using prompt strategy: %s", prompt_strategy)
+        static_prefix, prompt = get_prompt_by_strategy(
             strategy=prompt_strategy,
             role=role,
             company=company,
             round_type=round_type,
             difficulty=difficulty,
             previous_questions=previous_questions,
+            question_slot=question_slot,
         )
+        
+        # Reuse the cached model for this key/config/instruction combination
+        model = _resolve_model(api_key, generation_config, safety_settings, static_prefix)
             
-        print(f"Sending request to Gemini API with {prompt_strategy} strategy...")
+        _log.debug("Sending request to Gemini API with %s strategy...", prompt_strategy)
         response = model.generate_content(prompt)
-        print(f"Received response: {response}")
+        return _question_from_response(response, prompt, role, company, round_type, difficulty)
+    except Exception as exc:
+        raise RuntimeError(f"Gemini question generation failed: {exc}") from exc
+
+
+def _question_from_response(
+    response,
+    prompt: str,
+    role: str,
+    company: str,
+    round_type: str,
+    difficulty: str,
+) -> str:
+    if _log.isEnabledFor(logging.DEBUG):
+        _log.debug("Received response: %s", response)
+    
+    question = _extract_text_from_response(response)
+    _log.debug("Extracted question: %s", question)
+    
+    # Return the question if we got one
+    if question:
+        # Clean up the question
+        question = question.strip()
         
-        question = _extract_text_from_response(response)
-        print(f"Extracted question: {question}")
+        # Remove common prefixes that LLMs sometimes add
+        question = _PREFIX_RE.sub("", question, count=1)
         
-        # Return the question if we got one
-        if question:
-            # Clean up the question
-            question = question.strip()
-            
-            # Remove common prefixes that LLMs sometimes add
-            prefixes_to_remove = [
-                "**Question:**",
-                "**Question**:",
-                "Question:",
-                "**Q:**",
-                "Q:",
-                "Interview Question:",
-                "**Interview Question:**",
-            ]
+        # Ensure question ends with a question mark
+        if not question.endswith("?"):
+            question += "?"
             
-            for prefix in prefixes_to_remove:
-                if question.startswith(prefix):
-                    question = question[len(prefix):].strip()
-                    break
+        _log.debug("Returning generated question: %s", question)
+        return question
+    # Get detailed error information
+    finish_reasons = []
+    for candidate in getattr(response, "candidates", []):
+        finish_reason = getattr(candidate, "finish_reason", "")
+        if finish_reason:
+            finish_reasons.append(str(finish_reason))
             
-            # Ensure question ends with a question mark
-            if not question.endswith("?"):
-                question += "?"
-                
-            print(f"Returning generated question: {question}")
-            return question
-        # Get detailed error information
-        finish_reasons = []
-        for candidate in getattr(response, "candidates", []):
-            finish_reason = getattr(candidate, "finish_reason", "")
-            if finish_reason:
-                finish_reasons.append(str(finish_reason))
-                
-            # Check for safety ratings
-            safety_ratings = getattr(candidate, "safety_ratings", [])
-            for rating in safety_ratings:
-                if getattr(rating, "blocked", False):
-                    finish_reasons.append(f"BLOCKED: {getattr(rating, 'category', 'Unknown')}")
-        
-        finish_reason_str = ", ".join(finish_reasons) if finish_reasons else "No finish reason provided"
-        print(f"Generation failed. Finish reasons: {finish_reason_str}")
-        
-        # Check for MAX_TOKENS issue
-        if "MAX_TOKENS" in finish_reason_str.upper() or "2" in finish_reason_str:
-            print("Hit max tokens limit")
-            raise RuntimeError(
-                "Response exceeded token limit. "
-                "Try increasing 'Max Tokens' in the LLM Generation Settings (recommended: 1024-2048)."
-            )
-        
-        # If we have safety issues, provide clear guidance
-        if any(r in finish_reason_str.upper() for r in ["SAFETY", "BLOCKED"]):
-            print("Content blocked by safety filters")
-            raise RuntimeError(
-                "Content blocked by Gemini safety filters. "
-                "Try adjusting your safety settings to 'Block None' or 'Block Few' in the app settings."
-            )
-            
-        # For other errors, provide more detailed information
-        error_details = {
-            "role": role,
-            "company": company,
-            "round_type": round_type,
-            "difficulty": difficulty,
-            "finish_reasons": finish_reasons,
-            "prompt_preview": prompt[:200] + "..." if len(prompt) > 200 else prompt
-        }
-        print(f"Error details: {error_details}")
-        
+        # Check for safety ratings
+        safety_ratings = getattr(candidate, "safety_ratings", [])
+        for rating in safety_ratings:
+            if getattr(rating, "blocked", False):
+                finish_reasons.append(f"BLOCKED: {getattr(rating, 'category', 'Unknown')}")
+    
+    finish_reason_str = ", ".join(finish_reasons) if finish_reasons else "No finish reason provided"
+    _log.debug("Generation failed. Finish reasons: %s", finish_reason_str)
+    
+    # Check for MAX_TOKENS issue
+    if "MAX_TOKENS" in finish_reason_str.upper() or "2" in finish_reason_str:
+        _log.debug("Hit max tokens limit")
         raise RuntimeError(
-            "Gemini returned an empty or invalid response. "
-            f"Finish reasons: {finish_reason_str}"
+            "Response exceeded token limit. "
+            "Try increasing 'Max Tokens' in the LLM Generation Settings (recommended: 1024-2048)."
+        )
+    
+    # If we have safety issues, provide clear guidance
+    if any(r in finish_reason_str.upper() for r in ["SAFETY", "BLOCKED"]):
+        _log.debug("Content blocked by safety filters")
+        raise RuntimeError(
+            "Content blocked by Gemini safety filters. "
+            "Try adjusting your safety settings to 'Block None' or 'Block Few' in the app settings."
+        )
+        
+    # For other errors, provide more detailed information
+    error_details = {
+        "role": role,
+        "company": company,
+        "round_type": round_type,
+        "difficulty": difficulty,
+        "finish_reasons": finish_reasons,
+        "prompt_preview": prompt[:200] + "..." if len(prompt) > 200 else prompt
+    }
+    _log.debug("Error details: %s", error_details)
+    
+    raise RuntimeError(
+        "Gemini returned an empty or invalid response. "
+        f"Finish reasons: {finish_reason_str}"
+    )
+
+
+def _chunk_text(chunk) -> str:
+    # Unlike _extract_text_from_response this keeps surrounding whitespace, so
+    # streamed chunks can be concatenated as-is.
+    candidates = getattr(chunk, "candidates", None) or []
+    return _join_candidate_parts(candidates[0]) if candidates else ""
+
+
+def _strip_question_prefix(text: str) -> str:
+    return _PREFIX_RE.sub("", text.lstrip(), count=1)
+
+
+def generate_question_stream(
+    role: str,
+    company: str,
+    round_type: str,
+    difficulty: str,
+    previous_questions: Optional[list] = None,
+    api_key: str | None = None,
+    generation_config: Optional[dict[str, float | int]] = None,
+    safety_settings: Optional[dict] = None,
+    prompt_strategy: str = "chain_of_thought",
+) -> Iterator[str]:
+    """Yield the generated question incrementally, e.g. for st.write_stream."""
+    if not api_key:
+        raise ValueError("GOOGLE_API_KEY missing. Please provide it via the .env file or settings.")
+
+    try:
+        static_prefix, prompt = get_prompt_by_strategy(
+            strategy=prompt_strategy,
+            role=role,
+            company=company,
+            round_type=round_type,
+            difficulty=difficulty,
+            previous_questions=previous_questions,
         )
+        model = _resolve_model(api_key, generation_config, safety_settings, static_prefix)
+        response = model.generate_content(prompt, stream=True)
+
+        # Buffer the head of the stream until a prefix can be recognised, strip it once,
+        # then pass the remaining chunks straight through. Trailing whitespace is held
+        # back so the stream never ends with it.
+        head = ""
+        prefix_checked = False
+        held_whitespace = ""
+        last_text = ""
+        for chunk in response:
+            text = _chunk_text(chunk)
+            if not text:
+                continue
+            if not prefix_checked:
+                head += text
+                if len(head.lstrip()) < _MAX_PREFIX_LEN:
+                    continue
+                text = _strip_question_prefix(head)
+                prefix_checked = True
+            text = held_whitespace + text
+            stripped = text.rstrip()
+            held_whitespace = text[len(stripped):]
+            if stripped:
+                last_text = stripped
+                yield stripped
+        if not prefix_checked:
+            last_text = _strip_question_prefix(head).rstrip()
+            if last_text:
+                yield last_text
+
+        if not last_text:
+            raise RuntimeError("Gemini returned an empty or invalid response.")
+        # Ensure question ends with a question mark
+        if not last_text.endswith("?"):
+            yield "?"
     except Exception as exc:
         raise RuntimeError(f"Gemini question generation failed: {exc}") from exc
@@ -1,30 +1,79 @@
-from typing import List, Dict, Optional
+import functools
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Optional
 import google.generativeai as genai
 
+from llm_utils import ensure_configured, api_key_fingerprint
+
+_ROLE_EXPLANATIONS: Mapping[str, str] = MappingProxyType({
+    "system": (
+        "SYSTEM role sets the AI's behavior, personality, and constraints. "
+        "It's like giving the AI its job description. "
+        "Example: 'You are an expert technical interviewer with 10 years experience.'"
+    ),
+    "user": (
+        "USER role represents the human's input - questions, requests, or responses. "
+        "This is what the person interacting with the AI says. "
+        "Example: 'Generate a coding interview question for a senior developer.'"
+    ),
+    "assistant": (
+        "ASSISTANT role represents the AI's previous responses in the conversation. "
+        "Used to maintain conversation history and context. "
+        "Example: 'Here's a question: Implement a LRU cache with O(1) operations.'"
+    ),
+})
+
+_ROLE_IMPORTANCE: Mapping[str, str] = MappingProxyType({
+    "system_importance": (
+        "System role is crucial for consistent behavior. "
+        "Without it, the AI might respond differently each time. "
+        "It's like the difference between 'answer this question' and "
+        "'you are an expert - answer this question professionally.'"
+    ),
+    "user_importance": (
+        "User role clearly marks what the human wants. "
+        "This helps the AI understand context and intent. "
+        "In multi-turn conversations, it tracks who said what."
+    ),
+    "assistant_importance": (
+        "Assistant role maintains conversation memory. "
+        "Without tracking previous assistant responses, the AI can't "
+        "reference earlier parts of the conversation or maintain consistency."
+    ),
+    "practical_example": (
+        "In our interview app, we use:\n"
+        "- SYSTEM: 'You are an expert interviewer...'\n"
+        "- USER: 'Generate a question for Software Engineer...'\n"
+        "- ASSISTANT: (previous questions to avoid repetition)\n"
+        "This structure ensures quality and context-aware questions."
+    ),
+})
+
+# Maps OpenAI-style roles to Gemini roles; unknown roles fall back to "model".
+_GEMINI_ROLE = {"user": "user"}.get
+
+
+@functools.lru_cache(maxsize=32)
+def _model_for(
+    api_key_hash: str, model_name: str, system_instruction: str
+) -> genai.GenerativeModel:
+    # Reuse the model (and its client) for repeated calls with the same key and
+    # instruction. The model keeps the client of the key configured when it is
+    # first used, so models are never shared between keys.
+    return genai.GenerativeModel(
+        model_name=model_name,
+        system_instruction=system_instruction
+    )
+
 
 class MessageRoleDemo:
     def __init__(self, api_key: str):
         self.api_key = api_key
-        genai.configure(api_key=api_key)
-
-    def explain_roles(self) -> Dict[str, str]:
-        return {
-            "system": (
-                "SYSTEM role sets the AI's behavior, personality, and constraints. "
-                "It's like giving the AI its job description. "
-                "Example: 'You are an expert technical interviewer with 10 years experience.'"
-            ),
-            "user": (
-                "USER role represents the human's input - questions, requests, or responses. "
-                "This is what the person interacting with the AI says. "
-                "Example: 'Generate a coding interview question for a senior developer.'"
-            ),
-            "assistant": (
-                "ASSISTANT role represents the AI's previous responses in the conversation. "
-                "Used to maintain conversation history and context. "
-                "Example: 'Here's a question: Implement a LRU cache with O(1) operations.'"
-            )
-        }
+        self._api_key_hash = api_key_fingerprint(api_key)
+        ensure_configured(api_key)
+
+    def explain_roles(self) -> Mapping[str, str]:
+        return _ROLE_EXPLANATIONS
 
     def openai_style_messages(
         self,
@@ -61,15 +110,11 @@ class MessageRoleDemo:
         # Gemini uses system_instruction separately
         system_instruction = system_prompt
 
-        # Build chat history in Gemini format
-        chat_history = []
-        if conversation_history:
-            for msg in conversation_history:
-                role = "user" if msg["role"] == "user" else "model"
-                chat_history.append({
-                    "role": role,
-                    "parts": [msg["content"]]
-                })
+        # Build chat history in Gemini format (anything that isn't "user" is the model)
+        chat_history = [
+            {"role": _GEMINI_ROLE(msg["role"], "model"), "parts": [msg["content"]]}
+            for msg in (conversation_history or [])
+        ]
 
         # Add current user message
         chat_history.append({
@@ -102,10 +147,7 @@ You understand how to calibrate questions for different experience levels and in
 The question should be specific, clear, and relevant to the role."""
 
         # Create model with system instruction (Gemini's way of handling system role)
-        model = genai.GenerativeModel(
-            model_name=model_name,
-            system_instruction=system_instruction
-        )
+        model = _model_for(self._api_key_hash, model_name, system_instruction)
 
         # Send user message
         response = model.generate_content(user_message)
@@ -138,32 +180,8 @@ The question should be specific, clear, and relevant to the role."""
 
         return conversation
 
-    def demonstrate_role_importance(self) -> Dict[str, str]:
-        return {
-            "system_importance": (
-                "System role is crucial for consistent behavior. "
-                "Without it, the AI might respond differently each time. "
-                "It's like the difference between 'answer this question' and "
-                "'you are an expert - answer this question professionally.'"
-            ),
-            "user_importance": (
-                "User role clearly marks what the human wants. "
-                "This helps the AI understand context and intent. "
-                "In multi-turn conversations, it tracks who said what."
-            ),
-            "assistant_importance": (
-                "Assistant role maintains conversation memory. "
-                "Without tracking previous assistant responses, the AI can't "
-                "reference earlier parts of the conversation or maintain consistency."
-            ),
-            "practical_example": (
-                "In our interview app, we use:\n"
-                "- SYSTEM: 'You are an expert interviewer...'\n"
-                "- USER: 'Generate a question for Software Engineer...'\n"
-                "- ASSISTANT: (previous questions to avoid repetition)\n"
-                "This structure ensures quality and context-aware questions."
-            )
-        }
+    def demonstrate_role_importance(self) -> Mapping[str, str]:
+        return _ROLE_IMPORTANCE
 
 
 # Example usage demonstrating understanding
@@ -10,15 +10,33 @@ This module shows understanding of various output formats that LLMs can produce:
 This demonstrates advanced LLM usage beyond simple text generation.
 """
 
+import asyncio
+import functools
+import hashlib
+import io
 import json
 import os
-from typing import Dict, List, Any, Generator, Optional
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, List, Any, Generator, Mapping, Optional, Tuple, Union
 from dataclasses import dataclass, asdict
 from enum import Enum
+from types import MappingProxyType
 
 import google.generativeai as genai
+from google.generativeai.types import HarmCategory, HarmProbability
 from dotenv import load_dotenv
 
+# genai.configure is process-global, so every module goes through the one
+# helper that remembers which key is active
+from llm_utils import ensure_configured
+
 
 class OutputType(Enum):
     """Different types of LLM outputs"""
@@ -28,7 +46,7 @@ class OutputType(Enum):
     WITH_METADATA = "with_metadata"
 
 
-@dataclass
+@dataclass(slots=True)
 class InterviewQuestion:
     """Structured format for interview questions"""
     question: str
@@ -40,7 +58,7 @@ class InterviewQuestion:
     estimated_time_minutes: int
 
 
-@dataclass
+@dataclass(slots=True)
 class QuestionWithMetadata:
     """Question with additional metadata"""
     question: str
@@ -51,15 +69,376 @@ class QuestionWithMetadata:
     finish_reason: str
 
 
+def _to_builtins(obj: Any) -> Dict[str, Any]:
+    """
+    Shallow field dict for the flat result dataclasses.
+    
+    Unlike dataclasses.asdict this does not recurse or deep-copy the lists,
+    which is all JSON encoding of the demo results needs.
+    """
+    return {name: getattr(obj, name) for name in obj.__slots__}
+
+
+class LLMCache:
+    """
+    Small in-memory response cache keyed by model, prompt and generation config.
+    
+    Demo prompts are built from a handful of role/round/difficulty values, so the
+    same request is sent over and over; a hit skips the network round-trip and
+    the token cost entirely. Any object with the same get/set (and aget/aset)
+    methods, e.g. a Redis wrapper, can be passed to OutputTypesDemo instead.
+    """
+    
+    def __init__(self, maxsize: int = 256, default_ttl: float = 3600):
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+    
+    @staticmethod
+    def make_key(model_name: str, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> str:
+        payload = json.dumps(
+            {"model": model_name, "prompt": prompt, "cfg": generation_config or {}},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    async def aget(self, key: str) -> Optional[Any]:
+        return self.get(key)
+    
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.set(key, value, ttl)
+
+
+class LocalDiskCache(LLMCache):
+    """
+    LLMCache that also persists entries as JSON files on disk.
+    
+    Meant for deterministic demo/CI replays: once the responses are on disk a
+    rerun of demonstrate_all_types needs no network access for them. Entries
+    live in ~/.cache/rpetni/<key>.json; the async path does the file I/O in a
+    worker thread so it does not block other in-flight generations.
+    """
+    
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        maxsize: int = 256,
+        default_ttl: float = 7 * 24 * 3600
+    ):
+        super().__init__(maxsize=maxsize, default_ttl=default_ttl)
+        self.directory = Path(directory or Path.home() / ".cache" / "rpetni")
+        self.directory.mkdir(parents=True, exist_ok=True)
+    
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+    
+    def _read(self, key: str) -> Optional[Any]:
+        try:
+            entry = _JSON_DECODER.decode(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        # Wall-clock expiry, since monotonic time does not survive a restart
+        if entry.get("expires_at", 0) < time.time():
+            return None
+        return entry.get("value")
+    
+    def _write(self, key: str, value: Any, ttl: float) -> None:
+        payload = json.dumps({"expires_at": time.time() + ttl, "value": value})
+        # A temp file of its own per write, so concurrent writers of one key
+        # never share one; the last replace wins
+        tmp_name = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=self.directory, suffix=".tmp", delete=False
+            ) as tmp:
+                tmp_name = tmp.name
+                tmp.write(payload)
+            os.replace(tmp_name, self._path(key))
+        except OSError:
+            if tmp_name is not None:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+    
+    def get(self, key: str) -> Optional[Any]:
+        value = super().get(key)
+        if value is None:
+            value = self._read(key)
+            if value is not None:
+                super().set(key, value)
+        return value
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        super().set(key, value, ttl)
+        self._write(key, value, ttl)
+    
+    async def aget(self, key: str) -> Optional[Any]:
+        value = LLMCache.get(self, key)
+        if value is None:
+            value = await asyncio.to_thread(self._read, key)
+            if value is not None:
+                LLMCache.set(self, key, value)
+        return value
+    
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        LLMCache.set(self, key, value, ttl)
+        await asyncio.to_thread(self._write, key, value, ttl)
+
+
+JSON_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
+# Reused for every structured payload; both use the C accelerated scanner/encoder
+_JSON_DECODER = json.JSONDecoder()
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, default=_to_builtins)
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Streamed text is handed on in batches of at most ~one frame or 256 chars
+_STREAM_FLUSH_SECONDS = 0.032
+_STREAM_FLUSH_CHARS = 256
+
+# Prompt templates; the JSON schema is static apart from the difficulty value
+_PROMPT_PLAIN = "Generate one interview question for a {role} in the {round_type} round."
+_PROMPT_DETAILED = "Generate one detailed interview question for a {role} in the {round_type} round."
+_PROMPT_JSON_INTRO = """Generate an interview question for a {role} in the {round_type} round at {difficulty} level.
+
+Return ONLY valid JSON with this exact structure:
+"""
+_PROMPT_JSON_OUTRO = """
+
+Ensure all fields are filled with relevant content."""
+_SCHEMA_HEAD = (
+    '{\n'
+    '    "question": "The actual interview question",\n'
+    '    "difficulty": "'
+)
+_SCHEMA_TAIL = """",
+    "category": "technical/behavioral/coding/etc",
+    "expected_topics": ["topic1", "topic2", "topic3"],
+    "follow_up_questions": ["follow-up 1", "follow-up 2"],
+    "evaluation_criteria": ["criterion 1", "criterion 2", "criterion 3"],
+    "estimated_time_minutes": 5
+}"""
+_PROMPT_BATCHED_INTRO = "Generate interview questions for a {role}.\n"
+_PROMPT_BATCHED_BODY = """
+Return ONLY valid JSON with this exact structure:
+{
+    "plain": "One interview question for the Coding round",
+    "structured": """ + "".join([_SCHEMA_HEAD, "Professional", _SCHEMA_TAIL]).replace("\n", "\n    ") + """,
+    "detailed": "One detailed interview question for the Behavioral round",
+    "technical": "One interview question for the Technical round"
+}
+
+The "structured" question is for the Coding round at Professional level.
+Ensure all fields are filled with relevant content."""
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+# Static comparison table, built once and shared read-only
+_COMPARISON = _freeze({
+    "plain_text": {
+        "description": "Simple string output",
+        "pros": ["Easy to use", "Human-readable", "Flexible"],
+        "cons": ["Hard to parse programmatically", "Inconsistent structure"],
+        "use_cases": [
+            "Simple Q&A",
+            "Human-facing content",
+            "When structure doesn't matter"
+        ],
+        "example": "What is polymorphism in OOP?"
+    },
+    "json_structured": {
+        "description": "Structured data in JSON format",
+        "pros": [
+            "Consistent structure",
+            "Easy to parse",
+            "Database-ready",
+            "Type-safe"
+        ],
+        "cons": ["Requires careful prompting", "May fail to parse"],
+        "use_cases": [
+            "APIs and integrations",
+            "Database storage",
+            "Programmatic processing",
+            "When you need specific fields"
+        ],
+        "example": {
+            "question": "Explain polymorphism",
+            "difficulty": "medium",
+            "category": "OOP"
+        }
+    },
+    "streaming": {
+        "description": "Incremental text delivery",
+        "pros": [
+            "Better UX (shows progress)",
+            "Lower perceived latency",
+            "Can stop early if needed"
+        ],
+        "cons": ["More complex to implement", "Can't parse until complete"],
+        "use_cases": [
+            "Chat interfaces",
+            "Long responses",
+            "Real-time applications",
+            "When UX matters"
+        ],
+        "example": "Text appears word-by-word like ChatGPT"
+    },
+    "with_metadata": {
+        "description": "Content plus generation details",
+        "pros": [
+            "Full transparency",
+            "Debugging info",
+            "Cost tracking",
+            "Quality monitoring"
+        ],
+        "cons": ["More data to handle", "Requires parsing response object"],
+        "use_cases": [
+            "Production monitoring",
+            "Cost optimization",
+            "Quality assurance",
+            "Debugging issues"
+        ],
+        "example": {
+            "text": "Question here",
+            "tokens": 150,
+            "time_ms": 1200,
+            "safety": "SAFE"
+        }
+    }
+})
+
+
+def _iter_json_fields(chunks: Iterable[str]) -> Generator[Tuple[str, Any], None, None]:
+    """
+    Incrementally parse a streamed top-level JSON object.
+    
+    Yields each (key, value) pair as soon as the value and the separator after
+    it have arrived, so early fields are usable before the object is complete.
+    Stops at the closing brace; raises ValueError on malformed input.
+    """
+    buf = ""
+    pos = None
+    for chunk in chunks:
+        buf += chunk
+        if pos is None:
+            start = buf.find("{")
+            if start < 0:
+                continue
+            pos = start + 1
+        while True:
+            key_start = _JSON_WHITESPACE.match(buf, pos).end()
+            if buf.startswith("}", key_start):
+                return
+            try:
+                key, end = _JSON_DECODER.raw_decode(buf, key_start)
+                colon = _JSON_WHITESPACE.match(buf, end).end()
+                if colon == len(buf):
+                    break
+                if buf[colon] != ":":
+                    raise ValueError(f"Expected ':' at position {colon}")
+                value, end = _JSON_DECODER.raw_decode(
+                    buf, _JSON_WHITESPACE.match(buf, colon + 1).end()
+                )
+            except json.JSONDecodeError:
+                # Key or value not fully received yet
+                break
+            # Wait for the separator: a trailing number may still be growing
+            sep = _JSON_WHITESPACE.match(buf, end).end()
+            if sep == len(buf):
+                break
+            if buf[sep] not in ",}":
+                raise ValueError(f"Expected ',' or '}}' at position {sep}")
+            yield key, value
+            if buf[sep] == "}":
+                return
+            pos = sep + 1
+    raise ValueError("Stream ended before the JSON object was complete")
+
+
+# The SDK's default async client is shared by every GenerativeModel in the
+# process and its grpc.aio channel stays bound to the event loop it was first
+# used on. Every async demo run therefore goes through this one long-lived
+# loop; a fresh asyncio.run loop per call would leave the client on a closed one.
+_ASYNC_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_ASYNC_LOOP_LOCK = threading.Lock()
+
+
+def _run_async(coro: Any) -> Any:
+    global _ASYNC_LOOP
+    with _ASYNC_LOOP_LOCK:
+        if _ASYNC_LOOP is None or _ASYNC_LOOP.is_closed():
+            _ASYNC_LOOP = asyncio.new_event_loop()
+        return _ASYNC_LOOP.run_until_complete(coro)
+
+
+# Enum value -> name tables for safety ratings and finish reasons. The SDK
+# enums are IntEnums, so these match both enum members and raw ints from older
+# transports.
+_CAT_NAMES = {category: category.name for category in HarmCategory}
+_PROB_NAMES = {probability: probability.name for probability in HarmProbability}
+_FINISH_REASON_NAMES = {reason: reason.name for reason in genai.protos.Candidate.FinishReason}
+
+
 class OutputTypesDemo:
     """
     Demonstrates different LLM output types and when to use each.
     """
     
-    def __init__(self, api_key: str, model_name: str = "gemini-2.0-flash-exp"):
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str = "gemini-2.0-flash-exp",
+        cache: Optional[LLMCache] = None,
+        cache_enabled: bool = True
+    ):
         self.api_key = api_key
         self.model_name = model_name
-        genai.configure(api_key=api_key)
+        self.cache_enabled = cache_enabled
+        if not cache_enabled:
+            # A zero-size cache never holds entries, so every lookup misses
+            cache = LLMCache(maxsize=0)
+        elif cache is None:
+            # Persist responses so replays of the demo skip the network
+            try:
+                cache = LocalDiskCache()
+            except OSError:
+                cache = LLMCache()
+        self.cache = cache
+        ensure_configured(api_key)
+        # Built once and reused by every generator instead of per call
+        self._model = genai.GenerativeModel(self.model_name)
+        self._json_model = genai.GenerativeModel(
+            self.model_name,
+            generation_config=JSON_GENERATION_CONFIG
+        )
     
     def generate_plain_text(self, role: str, round_type: str) -> str:
         """
@@ -75,14 +454,19 @@ class OutputTypesDemo:
         Returns:
             Plain text question
         """
-        model = genai.GenerativeModel(self.model_name)
+        model = self._model
         
-        prompt = f"Generate one interview question for a {role} in the {round_type} round."
+        prompt = _PROMPT_PLAIN.format(role=role, round_type=round_type)
         
-        response = model.generate_content(prompt)
+        key = self.cache.make_key(self.model_name, prompt)
+        if (hit := self.cache.get(key)) is not None:
+            return hit
+        
+        text = model.generate_content(prompt).text
         
         # Plain text output - just the string
-        return response.text
+        self.cache.set(key, text)
+        return text
     
     def generate_json_structured(
         self,
@@ -106,39 +490,55 @@ class OutputTypesDemo:
         Returns:
             Structured InterviewQuestion object
         """
-        model = genai.GenerativeModel(
-            self.model_name,
-            generation_config={
-                "response_mime_type": "application/json"
-            }
-        )
+        model = self._json_model
         
-        # Prompt that requests JSON format with specific schema
-        prompt = f"""Generate an interview question for a {role} in the {round_type} round at {difficulty} level.
-
-Return ONLY valid JSON with this exact structure:
-{{
-    "question": "The actual interview question",
-    "difficulty": "{difficulty}",
-    "category": "technical/behavioral/coding/etc",
-    "expected_topics": ["topic1", "topic2", "topic3"],
-    "follow_up_questions": ["follow-up 1", "follow-up 2"],
-    "evaluation_criteria": ["criterion 1", "criterion 2", "criterion 3"],
-    "estimated_time_minutes": 5
-}}
-
-Ensure all fields are filled with relevant content."""
+        prompt = self._json_prompt(role, round_type, difficulty)
         
-        response = model.generate_content(prompt)
+        # Cache the parsed fields so a hit skips both the request and the JSON parse
+        key = self.cache.make_key(self.model_name, prompt, JSON_GENERATION_CONFIG)
+        if (hit := self.cache.get(key)) is not None:
+            return InterviewQuestion(**hit)
+        
+        text = model.generate_content(prompt).text
         
+        structured = self._parse_interview_question(text, difficulty)
+        self.cache.set(key, asdict(structured))
+        return structured
+    
+    @staticmethod
+    def _json_prompt(role: str, round_type: str, difficulty: str) -> str:
+        # Prompt that requests JSON format with specific schema
+        return "".join([
+            _PROMPT_JSON_INTRO.format(role=role, round_type=round_type, difficulty=difficulty),
+            OutputTypesDemo._question_schema(difficulty),
+            _PROMPT_JSON_OUTRO
+        ])
+    
+    @staticmethod
+    def _question_schema(difficulty: str) -> str:
+        return "".join([_SCHEMA_HEAD, difficulty, _SCHEMA_TAIL])
+    
+    @staticmethod
+    def _parse_interview_question(text: str, difficulty: str) -> InterviewQuestion:
         # Parse JSON response
         try:
-            json_data = json.loads(response.text)
+            json_data = _JSON_DECODER.decode(text)
+        except json.JSONDecodeError:
+            json_data = None
+        return OutputTypesDemo._interview_question_from(json_data, text, difficulty)
+    
+    @staticmethod
+    def _interview_question_from(
+        json_data: Any,
+        raw_text: str,
+        difficulty: str
+    ) -> InterviewQuestion:
+        try:
             return InterviewQuestion(**json_data)
-        except (json.JSONDecodeError, TypeError) as e:
-            # Fallback if JSON parsing fails
+        except TypeError:
+            # Fallback if the JSON does not match the schema
             return InterviewQuestion(
-                question=response.text,
+                question=raw_text,
                 difficulty=difficulty,
                 category="general",
                 expected_topics=[],
@@ -147,6 +547,67 @@ Ensure all fields are filled with relevant content."""
                 estimated_time_minutes=5
             )
     
+    def generate_json_structured_stream(
+        self,
+        role: str,
+        round_type: str,
+        difficulty: str
+    ) -> Generator[Tuple[str, Any], None, None]:
+        """
+        Output Type 2b: Streamed JSON/Structured Output
+        
+        Same request as generate_json_structured, but with stream=True and an
+        incremental parser, so fields such as "question" can be shown while
+        the rest of the object is still being generated.
+        
+        Args:
+            role: Job role
+            round_type: Interview round
+            difficulty: Difficulty level
+            
+        Yields:
+            (field_name, value) pairs of InterviewQuestion in the order generated
+        """
+        prompt = self._json_prompt(role, round_type, difficulty)
+        
+        key = self.cache.make_key(self.model_name, prompt, JSON_GENERATION_CONFIG)
+        if (hit := self.cache.get(key)) is not None:
+            yield from hit.items()
+            return
+        
+        response = self._json_model.generate_content(prompt, stream=True)
+        
+        parts = []
+        fields = {}
+        
+        def texts() -> Generator[str, None, None]:
+            for chunk in response:
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield chunk.text
+        
+        text_stream = texts()
+        try:
+            for name, value in _iter_json_fields(text_stream):
+                fields[name] = value
+                yield name, value
+        except ValueError:
+            # Malformed or truncated JSON: fall back to the non-streaming parser
+            # and emit whatever was not already yielded
+            for _ in text_stream:
+                pass
+            structured = self._parse_interview_question("".join(parts), difficulty)
+            for name, value in _to_builtins(structured).items():
+                if name not in fields:
+                    fields[name] = value
+                    yield name, value
+            return
+        
+        try:
+            self.cache.set(key, asdict(InterviewQuestion(**fields)))
+        except TypeError:
+            pass
+    
     def generate_streaming(
         self,
         role: str,
@@ -165,19 +626,33 @@ Ensure all fields are filled with relevant content."""
             round_type: Interview round
             
         Yields:
-            Chunks of text as they're generated
+            Chunks of text as they're generated, coalesced so the caller is
+            not woken up for every few-token SDK chunk
         """
-        model = genai.GenerativeModel(self.model_name)
+        model = self._model
         
-        prompt = f"Generate one detailed interview question for a {role} in the {round_type} round."
+        prompt = _PROMPT_DETAILED.format(role=role, round_type=round_type)
         
         # Stream=True enables streaming
         response = model.generate_content(prompt, stream=True)
         
-        # Yield chunks as they arrive
+        # Yield chunks as they arrive, batched by size or time
+        buf = []
+        buffered = 0
+        deadline = time.monotonic() + _STREAM_FLUSH_SECONDS
         for chunk in response:
-            if chunk.text:
-                yield chunk.text
+            text = chunk.text
+            if not text:
+                continue
+            buf.append(text)
+            buffered += len(text)
+            if buffered >= _STREAM_FLUSH_CHARS or time.monotonic() >= deadline:
+                yield "".join(buf)
+                buf.clear()
+                buffered = 0
+                deadline = time.monotonic() + _STREAM_FLUSH_SECONDS
+        if buf:
+            yield "".join(buf)
     
     def generate_with_metadata(
         self,
@@ -199,184 +674,368 @@ Ensure all fields are filled with relevant content."""
         Returns:
             QuestionWithMetadata object with full response details
         """
-        import time
+        model = self._model
         
-        model = genai.GenerativeModel(self.model_name)
+        prompt = _PROMPT_PLAIN.format(role=role, round_type=round_type)
         
-        prompt = f"Generate one interview question for a {role} in the {round_type} round."
-        
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         response = model.generate_content(prompt)
-        generation_time = (time.time() - start_time) * 1000  # Convert to ms
+        generation_time = (time.perf_counter_ns() - start_ns) / 1_000_000  # Convert to ms
         
+        return self._build_metadata(response, generation_time)
+    
+    def _build_metadata(self, response: Any, generation_time: float) -> QuestionWithMetadata:
         # Extract metadata from response object
         question_text = response.text
         
         # Get usage metadata (tokens)
-        tokens_used = getattr(response, 'usage_metadata', None)
-        total_tokens = 0
-        if tokens_used:
-            total_tokens = getattr(tokens_used, 'total_token_count', 0)
-        
-        # Get safety ratings
-        safety_ratings = {}
-        if hasattr(response, 'candidates') and response.candidates:
+        try:
+            total_tokens = response.usage_metadata.total_token_count
+        except AttributeError:
+            total_tokens = 0
+        
+        # Get safety ratings and finish reason
+        try:
             candidate = response.candidates[0]
-            if hasattr(candidate, 'safety_ratings'):
-                for rating in candidate.safety_ratings:
-                    category = str(rating.category).split('.')[-1]
-                    probability = str(rating.probability).split('.')[-1]
-                    safety_ratings[category] = probability
-            
-            # Get finish reason
-            finish_reason = str(getattr(candidate, 'finish_reason', 'UNKNOWN')).split('.')[-1]
-        else:
+            finish_reason = _FINISH_REASON_NAMES.get(candidate.finish_reason, "UNKNOWN")
+            safety_ratings = {
+                _CAT_NAMES.get(rating.category) or str(rating.category):
+                    _PROB_NAMES.get(rating.probability) or str(rating.probability)
+                for rating in candidate.safety_ratings
+            }
+        except (AttributeError, IndexError, TypeError):
             finish_reason = "UNKNOWN"
+            safety_ratings = {}
         
         return QuestionWithMetadata(
             question=question_text,
             tokens_used=total_tokens,
-            generation_time_ms=round(generation_time, 2),
+            generation_time_ms=generation_time,
             model_name=self.model_name,
             safety_ratings=safety_ratings,
             finish_reason=finish_reason
         )
     
-    def compare_output_types(self) -> Dict[str, Dict[str, Any]]:
+    def generate_batched(self, role: str) -> Dict[str, Any]:
         """
-        Compare different output types and their use cases.
+        All four demo outputs from a single request.
         
+        Packs the plain, structured, detailed and technical prompts into one
+        JSON-mode call, trading per-type behaviour (real streaming, per-call
+        metadata) for one network round-trip instead of four.
+        
+        Args:
+            role: Job role
+            
         Returns:
-            Dictionary explaining each output type
+            Dictionary keyed like demonstrate_all_types; "with_metadata"
+            describes the combined call
         """
+        prompt = self._batched_prompt(role)
+        
+        start_ns = time.perf_counter_ns()
+        response = self._json_model.generate_content(prompt)
+        generation_time = (time.perf_counter_ns() - start_ns) / 1_000_000  # Convert to ms
+        
+        return self._parse_batched(response, generation_time)
+    
+    def _batched_prompt(self, role: str) -> str:
+        return "".join([_PROMPT_BATCHED_INTRO.format(role=role), _PROMPT_BATCHED_BODY])
+    
+    def _parse_batched(self, response: Any, generation_time: float) -> Dict[str, Any]:
+        text = response.text
+        try:
+            data = _JSON_DECODER.decode(text)
+        except json.JSONDecodeError:
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+        
+        metadata = self._build_metadata(response, generation_time)
+        metadata.question = data.get("technical") or text
         return {
-            "plain_text": {
-                "description": "Simple string output",
-                "pros": ["Easy to use", "Human-readable", "Flexible"],
-                "cons": ["Hard to parse programmatically", "Inconsistent structure"],
-                "use_cases": [
-                    "Simple Q&A",
-                    "Human-facing content",
-                    "When structure doesn't matter"
-                ],
-                "example": "What is polymorphism in OOP?"
-            },
-            "json_structured": {
-                "description": "Structured data in JSON format",
-                "pros": [
-                    "Consistent structure",
-                    "Easy to parse",
-                    "Database-ready",
-                    "Type-safe"
-                ],
-                "cons": ["Requires careful prompting", "May fail to parse"],
-                "use_cases": [
-                    "APIs and integrations",
-                    "Database storage",
-                    "Programmatic processing",
-                    "When you need specific fields"
-                ],
-                "example": {
-                    "question": "Explain polymorphism",
-                    "difficulty": "medium",
-                    "category": "OOP"
-                }
-            },
-            "streaming": {
-                "description": "Incremental text delivery",
-                "pros": [
-                    "Better UX (shows progress)",
-                    "Lower perceived latency",
-                    "Can stop early if needed"
-                ],
-                "cons": ["More complex to implement", "Can't parse until complete"],
-                "use_cases": [
-                    "Chat interfaces",
-                    "Long responses",
-                    "Real-time applications",
-                    "When UX matters"
-                ],
-                "example": "Text appears word-by-word like ChatGPT"
-            },
-            "with_metadata": {
-                "description": "Content plus generation details",
-                "pros": [
-                    "Full transparency",
-                    "Debugging info",
-                    "Cost tracking",
-                    "Quality monitoring"
-                ],
-                "cons": ["More data to handle", "Requires parsing response object"],
-                "use_cases": [
-                    "Production monitoring",
-                    "Cost optimization",
-                    "Quality assurance",
-                    "Debugging issues"
-                ],
-                "example": {
-                    "text": "Question here",
-                    "tokens": 150,
-                    "time_ms": 1200,
-                    "safety": "SAFE"
-                }
-            }
+            "plain_text": data.get("plain") or text,
+            "json_structured": self._interview_question_from(
+                data.get("structured"), text, "Professional"
+            ),
+            "streaming": data.get("detailed") or text,
+            "with_metadata": metadata
         }
     
-    def demonstrate_all_types(self, role: str = "Software Engineer") -> Dict[str, Any]:
+    # Async variants used by demonstrate_all_types so the independent requests overlap.
+    
+    async def _agenerate_plain_text(self, role: str, round_type: str) -> str:
+        model = self._model
+        prompt = _PROMPT_PLAIN.format(role=role, round_type=round_type)
+        key = self.cache.make_key(self.model_name, prompt)
+        if (hit := await self.cache.aget(key)) is not None:
+            return hit
+        response = await model.generate_content_async(prompt)
+        await self.cache.aset(key, response.text)
+        return response.text
+    
+    async def _agenerate_json_structured(
+        self,
+        role: str,
+        round_type: str,
+        difficulty: str
+    ) -> InterviewQuestion:
+        model = self._json_model
+        prompt = self._json_prompt(role, round_type, difficulty)
+        key = self.cache.make_key(self.model_name, prompt, JSON_GENERATION_CONFIG)
+        if (hit := await self.cache.aget(key)) is not None:
+            return InterviewQuestion(**hit)
+        response = await model.generate_content_async(prompt)
+        structured = self._parse_interview_question(response.text, difficulty)
+        await self.cache.aset(key, asdict(structured))
+        return structured
+    
+    async def _agenerate_streaming(self, role: str, round_type: str) -> AsyncIterator[str]:
+        model = self._model
+        prompt = _PROMPT_DETAILED.format(role=role, round_type=round_type)
+        response = await model.generate_content_async(prompt, stream=True)
+        buf = []
+        buffered = 0
+        deadline = time.monotonic() + _STREAM_FLUSH_SECONDS
+        async for chunk in response:
+            text = chunk.text
+            if not text:
+                continue
+            buf.append(text)
+            buffered += len(text)
+            if buffered >= _STREAM_FLUSH_CHARS or time.monotonic() >= deadline:
+                yield "".join(buf)
+                buf.clear()
+                buffered = 0
+                deadline = time.monotonic() + _STREAM_FLUSH_SECONDS
+        if buf:
+            yield "".join(buf)
+    
+    async def _agenerate_with_metadata(self, role: str, round_type: str) -> QuestionWithMetadata:
+        model = self._model
+        prompt = _PROMPT_PLAIN.format(role=role, round_type=round_type)
+        start_ns = time.perf_counter_ns()
+        response = await model.generate_content_async(prompt)
+        generation_time = (time.perf_counter_ns() - start_ns) / 1_000_000  # Convert to ms
+        return self._build_metadata(response, generation_time)
+    
+    async def _agenerate_batched(self, role: str) -> Dict[str, Any]:
+        prompt = self._batched_prompt(role)
+        start_ns = time.perf_counter_ns()
+        response = await self._json_model.generate_content_async(prompt)
+        generation_time = (time.perf_counter_ns() - start_ns) / 1_000_000  # Convert to ms
+        return self._parse_batched(response, generation_time)
+    
+    async def _astream_into(self, queue: asyncio.Queue, role: str, round_type: str) -> None:
+        try:
+            async for chunk in self._agenerate_streaming(role, round_type):
+                await queue.put(chunk)
+        finally:
+            await queue.put(None)
+    
+    def compare_output_types(self) -> Mapping[str, Mapping[str, Any]]:
+        """
+        Compare different output types and their use cases.
+        
+        Returns:
+            Read-only mapping explaining each output type
+        """
+        return _COMPARISON
+    
+    def demonstrate_all_types(
+        self,
+        role: str = "Software Engineer",
+        batched: bool = False,
+        as_json: bool = False
+    ) -> Union[Dict[str, Any], str]:
         """
         Generate examples of all output types.
         
         Args:
             role: Job role for examples
+            batched: Fetch all examples with one request (see generate_batched)
+            as_json: Return the results already encoded as a JSON string
             
         Returns:
-            Dictionary with examples of each output type
+            Dictionary with examples of each output type (the structured and
+            metadata entries are the dataclass instances), or its JSON encoding
         """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            results = _run_async(self._ademonstrate_all_types(role, batched))
+        else:
+            # Another loop can't be driven from inside a running one (e.g. Jupyter), so
+            # fall back to overlapping the blocking calls on worker threads
+            results = self._demonstrate_all_types_threaded(role, batched)
+        if as_json:
+            return _JSON_ENCODER.encode(results)
+        return results
+    
+    def _demonstrate_all_types_threaded(self, role: str, batched: bool = False) -> Dict[str, Any]:
         results = {}
+        write = sys.stdout.write
+        write("Generating examples of different output types...\n" + "=" * 60 + "\n")
+        sys.stdout.flush()
         
-        print("Generating examples of different output types...")
-        print("=" * 60)
+        if batched:
+            batch = self.generate_batched(role)
+            plain = batch["plain_text"]
+            structured = batch["json_structured"]
+            with_meta = batch["with_metadata"]
+            streamed = iter((batch["streaming"],))
+            executor = None
+        else:
+            executor = ThreadPoolExecutor(max_workers=3)
+            f_plain = executor.submit(self.generate_plain_text, role, "Coding")
+            f_structured = executor.submit(
+                self.generate_json_structured, role, "Coding", "Professional"
+            )
+            f_meta = executor.submit(self.generate_with_metadata, role, "Technical")
+            # Streaming stays on this thread so chunks print as they arrive
+            streamed = self.generate_streaming(role, "Behavioral")
         
-        # 1. Plain text
-        print("\n1. PLAIN TEXT OUTPUT:")
-        plain = self.generate_plain_text(role, "Coding")
-        results["plain_text"] = plain
-        print(f"   {plain[:100]}...")
-        
-        # 2. JSON structured
-        print("\n2. JSON STRUCTURED OUTPUT:")
-        structured = self.generate_json_structured(role, "Coding", "Professional")
-        results["json_structured"] = asdict(structured)
-        print(f"   Question: {structured.question[:80]}...")
-        print(f"   Category: {structured.category}")
-        print(f"   Expected topics: {', '.join(structured.expected_topics[:3])}")
-        
-        # 3. Streaming
-        print("\n3. STREAMING OUTPUT:")
-        print("   ", end="", flush=True)
-        streaming_text = ""
-        for chunk in self.generate_streaming(role, "Behavioral"):
-            print(chunk, end="", flush=True)
-            streaming_text += chunk
-        results["streaming"] = streaming_text
-        print()
-        
-        # 4. With metadata
-        print("\n4. OUTPUT WITH METADATA:")
-        with_meta = self.generate_with_metadata(role, "Technical")
-        results["with_metadata"] = asdict(with_meta)
-        print(f"   Question: {with_meta.question[:80]}...")
-        print(f"   Tokens used: {with_meta.tokens_used}")
-        print(f"   Generation time: {with_meta.generation_time_ms}ms")
-        print(f"   Finish reason: {with_meta.finish_reason}")
+        try:
+            if executor is not None:
+                plain = f_plain.result()
+            results["plain_text"] = plain
+            write(self._plain_section(plain))
+            
+            if executor is not None:
+                structured = f_structured.result()
+            results["json_structured"] = structured
+            write(self._structured_section(structured))
+            
+            write("\n3. STREAMING OUTPUT:\n   ")
+            sys.stdout.flush()
+            streaming_parts = []
+            for chunk in streamed:
+                write(chunk)
+                sys.stdout.flush()
+                streaming_parts.append(chunk)
+            results["streaming"] = "".join(streaming_parts)
+            
+            if executor is not None:
+                with_meta = f_meta.result()
+            results["with_metadata"] = with_meta
+            write(self._metadata_section(with_meta))
+            sys.stdout.flush()
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
         
         return results
+    
+    # Each section is assembled in a buffer and written in one go; only the
+    # streaming section writes (and flushes) incrementally.
+    
+    @staticmethod
+    def _plain_section(plain: str) -> str:
+        out = io.StringIO()
+        out.write("\n1. PLAIN TEXT OUTPUT:\n")
+        out.write(f"   {plain[:100]}...\n")
+        return out.getvalue()
+    
+    @staticmethod
+    def _structured_section(structured: InterviewQuestion) -> str:
+        out = io.StringIO()
+        out.write("\n2. JSON STRUCTURED OUTPUT:\n")
+        out.write(f"   Question: {structured.question[:80]}...\n")
+        out.write(f"   Category: {structured.category}\n")
+        out.write(f"   Expected topics: {', '.join(structured.expected_topics[:3])}\n")
+        return out.getvalue()
+    
+    @staticmethod
+    def _metadata_section(with_meta: QuestionWithMetadata) -> str:
+        out = io.StringIO()
+        out.write("\n\n4. OUTPUT WITH METADATA:\n")
+        out.write(f"   Question: {with_meta.question[:80]}...\n")
+        out.write(f"   Tokens used: {with_meta.tokens_used}\n")
+        out.write(f"   Generation time: {with_meta.generation_time_ms:.2f}ms\n")
+        out.write(f"   Finish reason: {with_meta.finish_reason}\n")
+        return out.getvalue()
+    
+    async def _ademonstrate_all_types(self, role: str, batched: bool = False) -> Dict[str, Any]:
+        # All four requests are independent, so they are started up front and
+        # printed in order as they finish instead of waiting on each in turn.
+        stream_queue: asyncio.Queue = asyncio.Queue()
+        if batched:
+            batch_task = asyncio.create_task(self._agenerate_batched(role))
+            
+            async def batch_field(name: str) -> Any:
+                return (await batch_task)[name]
+            
+            async def batch_stream() -> None:
+                try:
+                    await stream_queue.put(await batch_field("streaming"))
+                finally:
+                    await stream_queue.put(None)
+            
+            plain_task = asyncio.create_task(batch_field("plain_text"))
+            structured_task = asyncio.create_task(batch_field("json_structured"))
+            stream_task = asyncio.create_task(batch_stream())
+            meta_task = asyncio.create_task(batch_field("with_metadata"))
+            tasks = (batch_task, plain_task, structured_task, stream_task, meta_task)
+        else:
+            plain_task = asyncio.create_task(self._agenerate_plain_text(role, "Coding"))
+            structured_task = asyncio.create_task(
+                self._agenerate_json_structured(role, "Coding", "Professional")
+            )
+            stream_task = asyncio.create_task(self._astream_into(stream_queue, role, "Behavioral"))
+            meta_task = asyncio.create_task(self._agenerate_with_metadata(role, "Technical"))
+            tasks = (plain_task, structured_task, stream_task, meta_task)
+        
+        results = {}
+        
+        write = sys.stdout.write
+        write("Generating examples of different output types...\n" + "=" * 60 + "\n")
+        sys.stdout.flush()
+        
+        try:
+            # 1. Plain text
+            plain = await plain_task
+            results["plain_text"] = plain
+            write(self._plain_section(plain))
+            
+            # 2. JSON structured
+            structured = await structured_task
+            results["json_structured"] = structured
+            write(self._structured_section(structured))
+            
+            # 3. Streaming
+            write("\n3. STREAMING OUTPUT:\n   ")
+            sys.stdout.flush()
+            streaming_parts = []
+            while (chunk := await stream_queue.get()) is not None:
+                write(chunk)
+                sys.stdout.flush()
+                streaming_parts.append(chunk)
+            await stream_task
+            results["streaming"] = "".join(streaming_parts)
+            
+            # 4. With metadata
+            with_meta = await meta_task
+            results["with_metadata"] = with_meta
+            write(self._metadata_section(with_meta))
+            sys.stdout.flush()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        return results
+
+
+@functools.cache
+def _api_key() -> Optional[str]:
+    # .env is read once per process, however many times the demo is started
+    load_dotenv()
+    return os.getenv("GOOGLE_API_KEY")
 
 
 # Example usage
 if __name__ == "__main__":
-    load_dotenv()
-    api_key = os.getenv("GOOGLE_API_KEY")
+    api_key = _api_key()
     
     if not api_key:
         print("⚠️  No GOOGLE_API_KEY found in environment.")
@@ -1,12 +1,18 @@
+import functools
 import json
 import os
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from string import Template
 
 import streamlit as st
 import streamlit.components.v1 as components
 
 from llm_utils import (
-    generate_question, 
+    api_key_fingerprint,
+    generate_question,
+    generate_question_stream,
     validate_google_api_key, 
     HarmCategory, 
     HarmBlockThreshold, 
@@ -14,6 +20,7 @@ from llm_utils import (
     DEFAULT_GENERATION_CONFIG
 )
 from audio_input import render_audio_input_panel
+from prompt_strategies import extend_prior_list
 from ui_components import (
     display_question,
     display_response_area,
@@ -22,375 +29,435 @@ from ui_components import (
     get_response_aria_label,
 )
 
-def practice_session(standalone: bool = True):
-    if standalone:
-        st.set_page_config(
-            page_title="Practice Session",
-            page_icon="🎤",
-            layout="centered"
-        )
-    
-    # Initialize session state variables if they don't exist
-    required_state = {
-        'questions': [],
-        'current_question_index': 0,
-        'answers': {},
-        'question_timers': {},
-        'question_locked': {},
-        'safety_settings': DEFAULT_SAFETY_SETTINGS.copy(),
-        'generation_config': DEFAULT_GENERATION_CONFIG.copy(),
-        'initialized': True,
-        'google_api_key': st.session_state.get('google_api_key', ''),
-        'prompt_strategy': st.session_state.get('prompt_strategy', 'chain_of_thought')
+QUESTION_COUNT = 5
+# How long a session waits on another session streaming the same batch's first question
+_FIRST_QUESTION_TIMEOUT_SECONDS = 120
+
+# Static markup, built once at import. Streamlit drops elements that are not
+# re-sent on a rerun, so these are still emitted every run; keeping them as
+# whitespace-collapsed constants just trims what goes over the wire.
+_PRACTICE_CSS = " ".join("""
+<style>
+    .main {
+        max-width: 800px;
+        margin: 0 auto;
+        padding: 20px;
     }
-    
-    # Initialize any missing session state variables
-    for key, default_value in required_state.items():
-        if key not in st.session_state:
-            st.session_state[key] = default_value
-    
-    st.markdown("""
-        <style>
-            .main {
-                max-width: 800px;
-                margin: 0 auto;
-                padding: 20px;
-            }
-            .question-box {
-                background-color: #f8f9fa;
-                border-radius: 10px;
-                padding: 20px;
-                margin: 20px 0;
-                border-left: 5px solid #6C63FF;
-            }
-            .timer {
-                font-size: 24px;
-                font-weight: bold;
-                color: #6C63FF;
-                text-align: center;
-                margin: 20px 0;
-            }
-            .controls {
-                display: flex;
-                justify-content: center;
-                gap: 15px;
-                margin: 30px 0;
-            }
-            .response-area {
-                min-height: 200px;
-                padding: 15px;
-                border: 1px solid #ddd;
-                border-radius: 8px;
-                margin: 20px 0;
-            }
-        </style>
-    """, unsafe_allow_html=True)
-    
-    # Get parameters from query
-    difficulty = st.query_params.get("difficulty", "Professional")
-    round_type = st.query_params.get("round", "Coding")
-    
-    # Header
-    col1, col2 = st.columns([5, 1])
-    with col1:
-        st.title("Practice Session")
-        st.caption(f"{round_type} • {difficulty} Level")
-    
-    # Get parameters from query or use defaults
-    role = st.query_params.get("role", "Software Engineer")
-    company = st.query_params.get("company", "a tech company")
-    round_type = st.query_params.get("round", "Coding")
-    difficulty = st.query_params.get("difficulty", "Professional")
-    # Coding rounds should NOT use audio - they need text input for code
-    is_coding_round = round_type.lower() == "coding"
-    if "audio_checkbox" not in st.session_state:
-        default_audio = st.session_state.get("audio_mode_enabled")
-        if default_audio is None:
-            # Disable audio for coding rounds, enable for others by default
-            default_audio = False if is_coding_round else True
-        st.session_state.audio_checkbox = bool(default_audio)
-    
-    # Resolve API key (session first, then environment)
-    api_key = st.session_state.get('google_api_key') or os.getenv('GOOGLE_API_KEY')
+    .question-box {
+        background-color: #f8f9fa;
+        border-radius: 10px;
+        padding: 20px;
+        margin: 20px 0;
+        border-left: 5px solid #6C63FF;
+    }
+    .timer {
+        font-size: 24px;
+        font-weight: bold;
+        color: #6C63FF;
+        text-align: center;
+        margin: 20px 0;
+    }
+    .controls {
+        display: flex;
+        justify-content: center;
+        gap: 15px;
+        margin: 30px 0;
+    }
+    .response-area {
+        min-height: 200px;
+        padding: 15px;
+        border: 1px solid #ddd;
+        border-radius: 8px;
+        margin: 20px 0;
+    }
+    [class*="st-key-response-area-"] {
+        margin-bottom: 1rem;
+    }
+    [class*="st-key-answer-block-"] {
+        margin-bottom: 1.5rem;
+    }
+</style>
+""".split())
 
-    # Generate questions if we don't have any yet
-    if not st.session_state.questions:
-        # Create a container for the loading message
-        loading_placeholder = st.empty()
-        
+_FINISHED_BANNER_HTML = " ".join("""
+<div style="
+    display:flex;
+    flex-direction:column;
+    gap:4px;
+    align-items:center;
+    justify-content:center;
+    padding:12px 16px;
+    border:1px solid #e5e7eb;
+    border-radius:10px;
+    background:#fff;
+    box-shadow:0 3px 8px rgba(0,0,0,0.05);
+    font-family:'Source Sans Pro', 'Segoe UI', system-ui;
+">
+    <span style="font-size:0.9rem;color:#6b7280;">Status</span>
+    <div style="font-size:1.1rem;font-weight:600;color:#10b981;">
+        Interview is ended
+    </div>
+</div>
+""".split())
+
+# Session defaults for a practice session. Mutable defaults are factories so
+# every session gets its own copy, and the copies are only made when missing.
+_REQUIRED_STATE_ITEMS = (
+    ('questions', list),
+    ('current_question_index', 0),
+    ('answers', dict),
+    ('question_timers', dict),
+    ('question_locked', dict),
+    ('safety_settings', DEFAULT_SAFETY_SETTINGS.copy),
+    ('generation_config', DEFAULT_GENERATION_CONFIG.copy),
+    ('initialized', True),
+    ('google_api_key', ''),
+    ('prompt_strategy', 'chain_of_thought'),
+)
+
+# Per-question time limits keyed by (round, difficulty), looked up exact match
+# first, then any difficulty of the round, then the round wildcard. Coding
+# practice gets a dedicated 15-minute timer at every difficulty, all other
+# rounds ("*") reuse the legacy durations (Beginner → 3 min, Professional → 5 min).
+_TIMER_SECONDS: dict[tuple[str, str], int] = {
+    ("coding", "*"): 15 * 60,
+    ("*", "beginner"): 3 * 60,
+    ("*", "professional"): 5 * 60,
+}
+
+_ROLE_FEEDBACK: dict[str, tuple[str, ...]] = {
+    "software engineer": (
+        "💻 Great job on the technical questions!",
+        "💡 Consider discussing your problem-solving process in more detail.",
+        "📚 Keep practicing coding challenges to improve your speed and accuracy.",
+    ),
+    "data scientist": (
+        "📊 Good work on the data analysis questions!",
+        "🧠 Consider discussing more about your approach to data cleaning and feature engineering.",
+        "📈 Practice explaining complex statistical concepts in simple terms.",
+    ),
+    "product manager": (
+        "🎯 Good job on the product thinking questions!",
+        "🤝 Consider discussing more about stakeholder management.",
+        "📝 Practice creating clear and concise product requirements.",
+    ),
+}
+_DEFAULT_FEEDBACK = (
+    "😎 You're doing great!",
+    "📚 Keep practicing to improve your interview skills.",
+)
+
+_TIMER_HTML = Template("""
+<div id="$timer_dom_id" data-remaining="$remaining" style="
+    display:flex;
+    flex-direction:column;
+    gap:2px;
+    align-items:center;
+    justify-content:center;
+    padding:8px 12px;
+    border:1px solid #e5e7eb;
+    border-radius:8px;
+    background:#fff;
+    box-shadow:0 2px 4px rgba(0,0,0,0.05);
+    font-family:'Source Sans Pro', 'Segoe UI', system-ui;
+    min-width: 100px;
+">
+    <span style="font-size:0.9rem;color:#6b7280;">Question Countdown</span>
+    <div class="timer-watch__value" style="font-size:1.8rem;font-weight:700;color:#6C63FF;">
+        $remaining_clock
+    </div>
+</div>
+$script
+""")
+
+_TIMER_SCRIPT = Template("""<script>
+(function() {
+    const container = document.getElementById('$timer_dom_id');
+    if (!container) return;
+    const valueEl = container.querySelector('.timer-watch__value');
+    let remaining = Number(container.dataset.remaining) || 0;
+    const pad = (val) => String(val).padStart(2, '0');
+    const render = () => {
+        const mins = pad(Math.floor(remaining / 60));
+        const secs = pad(remaining % 60);
+        valueEl.textContent = `$${mins}:$${secs}`;
+    };
+    // No rerun is requested here: the answer box locks client-side and the
+    // server derives the lock from the question's start time on its next run.
+    const notifyLock = () => {
+        (window.parent || window).postMessage({type: 'timer-lock', index: $current_index}, '*');
+    };
+    render();
+    const interval = setInterval(() => {
+        remaining = Math.max(remaining - 1, 0);
+        render();
+        if (remaining === 0) {
+            clearInterval(interval);
+            notifyLock();
+        }
+    }, 1000);
+})();
+</script>""")
+
+# Session keys kept by "Start New Interview"; everything else (answers, answer
+# widgets, timers, locks) belongs to the finished interview and is dropped
+_PERSIST_KEYS = frozenset({
+    'google_api_key',
+    'user_api_key',
+    'validated_api_key',
+    'prompt_strategy',
+    'safety_settings',
+    'generation_config',
+    'question_batch_seed',
+    'role',
+    'company',
+})
+
+
+# Worker threads for questions 2-5. Plain threads running the synchronous SDK
+# call: an asyncio loop per batch would leave the SDK's shared async client
+# bound to a loop that is closed by the time the next batch starts.
+_QUESTION_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="question-batch")
+
+
+class _QuestionBatch:
+    # Questions for one interview configuration. The first is streamed into the
+    # page; the rest are generated on worker threads and appended here as
+    # they complete, so nobody waits on the slowest request to start answering.
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.questions: list[str] = []
+        # The questions above, pre-formatted for the prompt's previous-questions block
+        self.prior_list = ""
+        self.error: Exception | None = None
+        # Background requests still in flight, and the slots whose request failed
+        self.pending = 0
+        self._failed_slots: list[int] = []
+        self._question_kwargs: dict = {}
+        # Set once the first question is in, or its generation failed
+        self.first_ready = threading.Event()
+        self._claimed = False
+
+    def claim(self) -> tuple[bool, threading.Event]:
+        # Only one session streams the first question for a given batch; the
+        # event returned is the one that attempt will set
+        with self._lock:
+            if self._claimed:
+                return False, self.first_ready
+            self._claimed = True
+            return True, self.first_ready
+
+    def release(self) -> None:
+        # The claiming run ended without a first question (a click interrupted
+        # the stream with a rerun or stop). Hand the batch back and wake anyone
+        # waiting on that attempt so one of them can claim it.
+        with self._lock:
+            ready, self.first_ready = self.first_ready, threading.Event()
+            self._claimed = False
+        ready.set()
+
+    def fill_remaining(self, first_question: str, question_kwargs: dict) -> None:
+        # Record the first question and count the requests for the rest in one
+        # step, so no session sees the question without the others pending
+        with self._lock:
+            self.questions.append(first_question)
+            self.prior_list = extend_prior_list(self.prior_list, first_question)
+            self._question_kwargs = question_kwargs
+            slots = range(2, QUESTION_COUNT + 1)
+            self.pending += len(slots)
+        self._request(slots)
+
+    def retry_failed(self) -> None:
+        # Ask again for the slots whose request failed
+        with self._lock:
+            slots, self._failed_slots = self._failed_slots, []
+            self.error = None
+            self.pending += len(slots)
+        self._request(slots)
+
+    def _request(self, slots) -> None:
+        # Request the questions together; each is appended as it lands. Each
+        # request is told its slot so the parallel questions don't converge.
+        for number in slots:
+            future = _QUESTION_POOL.submit(
+                generate_question,
+                previous_questions=self.prior_list,
+                question_slot=(number, QUESTION_COUNT),
+                **self._question_kwargs,
+            )
+            future.add_done_callback(functools.partial(self._collect, number))
+
+    def _collect(self, number: int, future: Future) -> None:
         try:
-            # Show initial loading message
-            with loading_placeholder.container():
-                st.info("🔄 Preparing your interview questions...")
-                progress_bar = st.progress(0)
-            
-            # Generate questions
-            questions = []
-            for i in range(5):
-                # Update progress
-                progress = (i + 1) / 5
-                with loading_placeholder.container():
-                    st.info(f"🔄 Generating question {i+1} of 5...")
-                    progress_bar.progress(progress)
-                
-                question = generate_question(
-                    role=role,
-                    company=company,
-                    round_type=round_type,
-                    difficulty=difficulty,
-                    previous_questions=questions,  # Use the local questions list
-                    api_key=api_key,
-                    generation_config=st.session_state.generation_config,
-                    safety_settings=st.session_state.safety_settings,
-                    prompt_strategy=st.session_state.get('prompt_strategy', 'chain_of_thought'),
-                )
-                questions.append(question)
-            
-            # Store all questions in session state at once
-            st.session_state.questions = questions
-            
-            # Clear the loading message
-            loading_placeholder.empty()
-            
-            # Rerun to show the first question
-            st.rerun()
-            
-        except ValueError as e:
-            loading_placeholder.empty()
-            st.error(f"❌ Content safety violation: {str(e)}")
-            st.info("Please adjust your safety settings or try again.")
-            st.session_state.questions = []  # Reset questions
-            st.stop()
-            
+            question = future.result().strip()
         except Exception as e:
-            loading_placeholder.empty()
-            error_msg = str(e).lower()
-            if "api key" in error_msg or "api_key" in error_msg or "finish reasons: 3" in error_msg:
-                st.error("❌ API Error: Invalid or missing Google API key")
-                st.info("Please check your API key in the settings and try again.")
-            else:
-                st.error(f"❌ An error occurred while generating questions: {str(e)}")
-            st.session_state.questions = []  # Reset questions
-            st.stop()
-            
-        st.session_state.question_timers = {}
+            with self._lock:
+                self.error = e
+                self._failed_slots.append(number)
+                self.pending -= 1
+            return
+        with self._lock:
+            self.questions.append(question)
+            self.pending -= 1
 
-    round_key = round_type.lower()
-    difficulty_key = difficulty.lower()
-    # Coding practice gets a dedicated 15-minute timer, all other rounds reuse the
-    # legacy durations (Beginner → 3 min, Professional → 5 min).
-    if round_key == "coding":
-        per_question_seconds = 15 * 60
-    else:
-        per_question_seconds_map = {
-            "beginner": 3 * 60,
-            "professional": 5 * 60,
-        }
-        per_question_seconds = per_question_seconds_map.get(difficulty_key, 5 * 60)
 
-    interview_finished = st.session_state.get('finished', False)
-    if interview_finished:
-        st.session_state.audio_mode_enabled = False
-        st.session_state.audio_checkbox = False
-        total_questions = len(st.session_state.questions)
-        snapshot_answers: dict[int, str] = {}
-        for idx in range(total_questions):
-            widget_key = f"answer_input_{idx}"
-            if widget_key in st.session_state:
-                snapshot_answers[idx] = st.session_state[widget_key]
-            else:
-                snapshot_answers[idx] = st.session_state.answers.get(idx, "")
-        st.session_state.answers.update(snapshot_answers)
-        st.markdown(
-            """
-            <div style="
-                display:flex;
-                flex-direction:column;
-                gap:4px;
-                align-items:center;
-                justify-content:center;
-                padding:12px 16px;
-                border:1px solid #e5e7eb;
-                border-radius:10px;
-                background:#fff;
-                box-shadow:0 3px 8px rgba(0,0,0,0.05);
-                font-family:'Source Sans Pro', 'Segoe UI', system-ui;
-            ">
-                <span style="font-size:0.9rem;color:#6b7280;">Status</span>
-                <div style="font-size:1.1rem;font-weight:600;color:#10b981;">
-                    Interview is ended
-                </div>
-            </div>
-            """,
-            unsafe_allow_html=True,
-        )
-        display_interview_summary(st.session_state.questions, st.session_state.answers)
+@st.cache_resource(ttl=3600, show_spinner=False, max_entries=128)
+def _question_batch(
+    role: str,
+    company: str,
+    round_type: str,
+    difficulty: str,
+    prompt_strategy: str,
+    generation_config: dict,
+    safety_settings: dict,
+    batch_seed: int,
+    api_key_fingerprint: str,
+) -> _QuestionBatch:
+    # Same configuration -> same batch for an hour, so repeat sessions skip the LLM
+    # entirely. batch_seed lets "Start New Interview" ask for a fresh batch. The
+    # key fingerprint keeps batches (and any error they hold) to the sessions
+    # using the API key that paid for them.
+    return _QuestionBatch()
 
-        role = st.query_params.get("role", "Software Engineer").lower()
-        st.write("### Overall Feedback")
-        response_lengths = [len(st.session_state.answers.get(i, "")) for i in range(len(st.session_state.questions))]
-        avg_response_length = sum(response_lengths) / len(response_lengths) if response_lengths else 0
-        feedback = ["✅ You completed all the interview questions!"]
-        if avg_response_length < 100:
-            feedback.append("🔧 Consider providing more detailed answers with specific examples.")
-        role_specific = {
-            "software engineer": [
-                "💻 Great job on the technical questions!",
-                "💡 Consider discussing your problem-solving process in more detail.",
-                "📚 Keep practicing coding challenges to improve your speed and accuracy.",
-            ],
-            "data scientist": [
-                "📊 Good work on the data analysis questions!",
-                "🧠 Consider discussing more about your approach to data cleaning and feature engineering.",
-                "📈 Practice explaining complex statistical concepts in simple terms.",
-            ],
-            "product manager": [
-                "🎯 Good job on the product thinking questions!",
-                "🤝 Consider discussing more about stakeholder management.",
-                "📝 Practice creating clear and concise product requirements.",
-            ],
-        }
-        feedback.extend(
-            role_specific.get(
-                role,
-                [
-                    "😎 You're doing great!",
-                    "📚 Keep practicing to improve your interview skills.",
-                ],
+
+def _start_question_batch(batch: _QuestionBatch, question_kwargs: dict, placeholder) -> None:
+    while True:
+        claimed, ready = batch.claim()
+        if claimed:
+            break
+        # Already generated, or another session is streaming its first question
+        if not ready.wait(timeout=_FIRST_QUESTION_TIMEOUT_SECONDS):
+            raise TimeoutError("Timed out waiting for the first interview question.")
+        if batch.questions:
+            return
+        if batch.error is not None:
+            raise batch.error
+        # That attempt was abandoned before producing a question; try to claim it
+
+    try:
+        # Stream the first question so it renders as soon as its first tokens arrive
+        with placeholder.container():
+            st.info(f"🔄 Generating question 1 of {QUESTION_COUNT}...")
+            question = st.write_stream(
+                generate_question_stream(previous_questions=[], **question_kwargs)
             )
-        )
-        for item in feedback:
-            st.write(f"- {item}")
+        batch.fill_remaining(question.strip(), question_kwargs)
+    except Exception as e:
+        batch.error = e
+        raise
+    finally:
+        # Streamlit's rerun/stop exceptions are BaseExceptions and skip the
+        # handler above; without a question or an error the batch is released
+        if batch.questions or batch.error is not None:
+            ready.set()
+        else:
+            batch.release()
 
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("🔄 Start New Interview", use_container_width=True):
-                all_keys = (
-                    [
-                        'paused',
-                        'finished',
-                        'questions',
-                        'current_question_index',
-                        'question_timers',
-                        'question_locked',
-                        'audio_mode_enabled',
-                        'audio_checkbox',
-                    ]
-                    + [f"answer_{i}" for i in range(10)]
-                )
-                for key in all_keys:
-                    st.session_state.pop(key, None)
-                st.rerun()
-        with col2:
-            if st.button("🏠 Back to Setup", use_container_width=True):
-                st.query_params.clear()
-                st.session_state.clear()
-                st.rerun()
 
+def _report_generation_error(e: Exception) -> None:
+    if isinstance(e, ValueError):
+        st.error(f"❌ Content safety violation: {str(e)}")
+        st.info("Please adjust your safety settings or try again.")
         return
+    error_msg = str(e).lower()
+    if "api key" in error_msg or "api_key" in error_msg or "finish reasons: 3" in error_msg:
+        st.error("❌ API Error: Invalid or missing Google API key")
+        st.info("Please check your API key in the settings and try again.")
     else:
-        current_index = st.session_state.current_question_index
-        if 'question_timers' not in st.session_state:
-            st.session_state.question_timers = {}
-        if 'question_locked' not in st.session_state:
-            st.session_state.question_locked = {}
-        if current_index not in st.session_state.question_timers:
-            st.session_state.question_timers[current_index] = time.time()
-
-        question_start_time = st.session_state.question_timers[current_index]
-        elapsed = max(0, int(time.time() - question_start_time))
-        elapsed = min(elapsed, per_question_seconds)
-        remaining = per_question_seconds - elapsed
-        remaining_minutes = remaining // 60
-        remaining_seconds = remaining % 60
-
-        timer_dom_id = f"countdown-watch-{current_index}-{int(question_start_time)}"
-        timer_html = f"""
-        <div id=\"{timer_dom_id}\" style=\"
-            display:flex;
-            flex-direction:column;
-            gap:2px;
-            align-items:center;
-            justify-content:center;
-            padding:8px 12px;
-            border:1px solid #e5e7eb;
-            border-radius:8px;
-            background:#fff;
-            box-shadow:0 2px 4px rgba(0,0,0,0.05);
-            font-family:'Source Sans Pro', 'Segoe UI', system-ui;
-            min-width: 100px;
-        \">
-            <span style=\"font-size:0.9rem;color:#6b7280;\">Question Countdown</span>
-            <div class=\"timer-watch__value\" style=\"font-size:1.8rem;font-weight:700;color:#6C63FF;\">
-                {remaining_minutes:02d}:{remaining_seconds:02d}
-            </div>
-        </div>
-        {"" if remaining <= 0 else f"""<script>
-        (function() {{
-            const container = document.getElementById('{timer_dom_id}');
-            if (!container) return;
-            const valueEl = container.querySelector('.timer-watch__value');
-            let remaining = {remaining};
-            const pad = (val) => String(val).padStart(2, '0');
-            const render = () => {{
-                const mins = pad(Math.floor(remaining / 60));
-                const secs = pad(remaining % 60);
-                valueEl.textContent = `${{mins}}:${{secs}}`;
-            }};
-            const notifyLock = () => {{
-                if (window.parent) {{
-                    window.parent.postMessage({{type: 'timer-lock', index: {current_index}}}, '*');
-                    window.parent.postMessage({{type: 'streamlit:rerun'}}, '*');
-                }} else {{
-                    window.postMessage({{type: 'timer-lock', index: {current_index}}}, '*');
-                    window.postMessage({{type: 'streamlit:rerun'}}, '*');
-                }}
-            }};
-            render();
-            const interval = setInterval(() => {{
-                remaining = Math.max(remaining - 1, 0);
-                render();
-                if (remaining === 0) {{
-                    clearInterval(interval);
-                    notifyLock();
-                }}
-            }}, 1000);
-        }})();
-        </script>"""}
-        """
-        components.html(timer_html, height=110, scrolling=False)
-        if remaining == 0:
-            st.session_state.question_locked[current_index] = True
-            st.warning("Time's up for this question. Move to the next one when you're ready.")
+        st.error(f"❌ An error occurred while generating questions: {str(e)}")
 
-    # Get current question with safety check
-    try:
-        current_question = st.session_state.questions[st.session_state.current_question_index]
-    except IndexError:
-        st.error("No questions available. Please check your settings and try again.")
-        return
+
+@st.fragment(run_every=1.0)
+def _sync_pending_questions(batch: _QuestionBatch) -> None:
+    # Picks up questions the worker threads finished since the last poll. Once
+    # no request is left the page reruns, which stops rendering this poller.
+    state = st.session_state
+    if len(batch.questions) > len(state.questions) or not batch.pending:
+        state.questions = list(batch.questions)
+        st.rerun()
+    st.caption(f"⏳ Loading questions {len(state.questions) + 1}-{QUESTION_COUNT}...")
+
+
+def _offer_missing_questions(batch: _QuestionBatch) -> None:
+    # Every request is back but some failed: retry them, or go on without them
+    state = st.session_state
+    if batch.error is not None:
+        _report_generation_error(batch.error)
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("🔁 Retry missing questions", key="retry_questions", use_container_width=True):
+            batch.retry_failed()
+            st.rerun()
+    with col2:
+        if st.button(
+            f"➡️ Continue with {len(state.questions)} questions",
+            key="skip_missing_questions",
+            use_container_width=True,
+        ):
+            # Without a batch the interview is just the questions loaded so far
+            del state.question_batch
+            st.rerun()
+
+
+@st.fragment
+def _render_current_question(
+    per_question_seconds: int, is_coding_round: bool, total_questions: int
+) -> None:
+    # Typing in the answer box only reruns this fragment; navigation still reruns the page
+    state = st.session_state
+    current_index = state.current_question_index
+    resp_id = f"response-area-{current_index}"
+    widget_key = f"answer_input_{current_index}"
+    if 'question_timers' not in state:
+        state.question_timers = {}
+    if 'question_locked' not in state:
+        state.question_locked = {}
+    if current_index not in state.question_timers:
+        state.question_timers[current_index] = time.time()
+
+    question_start_time = state.question_timers[current_index]
+    elapsed = max(0, int(time.time() - question_start_time))
+    elapsed = min(elapsed, per_question_seconds)
+    remaining = per_question_seconds - elapsed
+
+    timer_dom_id = f"countdown-watch-{current_index}-{int(question_start_time)}"
+    # The script renders the countdown from data-remaining as soon as it loads;
+    # an expired timer has no script, so it gets its final value up front
+    timer_html = _TIMER_HTML.substitute(
+        timer_dom_id=timer_dom_id,
+        remaining=remaining,
+        remaining_clock="00:00" if remaining <= 0 else "--:--",
+        script="" if remaining <= 0 else _TIMER_SCRIPT.substitute(
+            timer_dom_id=timer_dom_id,
+            current_index=current_index,
+        ),
+    )
+    components.html(timer_html, height=110, scrolling=False)
+    if remaining == 0:
+        state.question_locked[current_index] = True
+        st.warning("Time's up for this question. Move to the next one when you're ready.")
+
+    current_question = state.questions[current_index]
     
     # Display current question and response area
     display_question(
         current_question,
-        st.session_state.current_question_index,
-        len(st.session_state.questions)
+        current_index,
+        total_questions
     )
     
     # Initialize answers in session state if not exists
-    if 'answers' not in st.session_state:
-        st.session_state.answers = {}
+    if 'answers' not in state:
+        state.answers = {}
     
     # Get current answer or initialize empty
-    current_answer = st.session_state.answers.get(st.session_state.current_question_index, "")
+    current_answer = state.answers.get(current_index, "")
     
     # Display response area and get user input
-    current_locked = st.session_state.question_locked.get(st.session_state.current_question_index, False)
-    response_container_id = f"response-area-{st.session_state.current_question_index}"
-    widget_key = f"answer_input_{st.session_state.current_question_index}"
+    current_locked = state.question_locked.get(current_index, False)
     
     # Get audio mode state - but never enable for coding rounds
-    audio_mode = st.session_state.get("audio_mode_enabled", st.session_state.get("audio_checkbox", False))
+    audio_mode = state.get("audio_mode_enabled", state.get("audio_checkbox", False))
     # Force disable audio for coding rounds
     if is_coding_round:
         audio_mode = False
@@ -398,32 +465,29 @@ def practice_session(standalone: bool = True):
         audio_only_mode = False
     else:
         audio_enabled = bool(
-            st.session_state.get(
+            state.get(
                 "audio_mode_enabled",
-                st.session_state.get("audio_checkbox", True),
+                state.get("audio_checkbox", True),
             )
         )
         audio_only_mode = audio_enabled
 
     # Main response area container
-    with st.container():
-        # Response area (text input - always visible for coding, hidden for audio mode in other rounds)
-        st.markdown(f'<div id="{response_container_id}">', unsafe_allow_html=True)
-        user_response = display_response_area(
-            st.session_state.current_question_index,
-            current_answer,
-            disabled=current_locked,
-            hidden=audio_mode and not current_locked and not is_coding_round,
-        )
-        st.markdown('</div>', unsafe_allow_html=True)
-
-        # Add some spacing before audio controls
-        st.markdown('<div style="margin-top: 1rem;"></div>', unsafe_allow_html=True)
+    with st.container(key=f"answer-block-{current_index}"):
+        # Response area (text input - always visible for coding, hidden for audio mode in other rounds).
+        # The keyed container gets an st-key-<resp_id> class the sync script looks for.
+        with st.container(key=resp_id):
+            user_response = display_response_area(
+                current_index,
+                current_answer,
+                disabled=current_locked,
+                hidden=audio_mode and not current_locked and not is_coding_round,
+            )
 
         # Audio input panel - NEVER show for coding rounds
         if not is_coding_round and audio_enabled and not current_locked:
             render_audio_input_panel(
-                response_container_id,
+                resp_id,
                 title="Prefer speaking? We'll transcribe in real time",
                 initial_text=user_response,
             )
@@ -435,20 +499,54 @@ def practice_session(standalone: bool = True):
             st.info("🎙️ Audio mode is enabled. Answers are captured from your microphone only.")
     
     # Get the latest response after potential audio updates
-    latest_response = st.session_state.get(widget_key, user_response)
-    st.session_state.answers[st.session_state.current_question_index] = latest_response
-    aria_label = get_response_aria_label(st.session_state.current_question_index)
-    
-    # Add some spacing before navigation
-    st.markdown('<div style="margin-top: 1.5rem;"></div>', unsafe_allow_html=True)
+    latest_response = state.get(widget_key, user_response)
+    state.answers[current_index] = latest_response
+
+    # Sent on every run, locked or not: Streamlit drops elements a rerun
+    # doesn't emit again
+    _inject_answer_sync_script(resp_id, current_index, current_locked, audio_only_mode)
+    if current_locked:
+        st.info("✋ Time is up for this question. Use navigation to move on.")
+
+
+@functools.lru_cache(maxsize=1)
+def _env_api_key() -> str | None:
+    return os.getenv('GOOGLE_API_KEY')
+
 
+@functools.lru_cache(maxsize=32)
+def _aria_label_js(question_index: int) -> str:
+    # The label as a JS string literal, for the injected sync script
+    return json.dumps(get_response_aria_label(question_index))
+
+
+def _inject_answer_sync_script(
+    resp_id: str,
+    current_index: int,
+    current_locked: bool,
+    audio_only_mode: bool,
+) -> None:
     st.markdown(
+        _answer_sync_script_html(resp_id, current_index, current_locked, audio_only_mode),
+        unsafe_allow_html=True,
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _answer_sync_script_html(
+    resp_id: str,
+    current_index: int,
+    current_locked: bool,
+    audio_only_mode: bool,
+) -> str:
+    # Built once per combination; the markup is re-sent on every run
+    return (
         f"""
         <script>
         (function() {{
-            const containerId = '{response_container_id}';
-            const ariaLabel = {json.dumps(aria_label)};
-            const container = document.getElementById(containerId);
+            const containerId = {json.dumps(resp_id)};
+            const ariaLabel = {_aria_label_js(current_index)};
+            const container = document.querySelector(`.st-key-${{containerId}}`);
             let textarea = null;
             let isLocked = Boolean({1 if current_locked else 0});
             const audioOnly = Boolean({1 if audio_only_mode else 0});
@@ -482,12 +580,43 @@ def practice_session(standalone: bool = True):
                 return textarea;
             }};
 
+            // Interim transcripts arrive many times a second; coalesce them so the
+            // textarea (and Streamlit's widget state) sees at most one input event
+            // per 250 ms. Committed text cancels any pending interim and goes out at once.
+            let pendingValue = null;
+            let pendingTimer = 0;
             const syncValue = (value) => {{
+                clearTimeout(pendingTimer);
+                pendingTimer = 0;
+                pendingValue = null;
                 const target = findTextarea();
                 if (!target) return;
                 target.value = value || '';
                 target.dispatchEvent(new Event('input', {{ bubbles: true }}));
             }};
+            const syncValueSoon = (value) => {{
+                pendingValue = value;
+                if (!pendingTimer) {{
+                    pendingTimer = setTimeout(() => syncValue(pendingValue), 250);
+                }}
+            }};
+
+            // Full committed answer; the audio panel only sends the newly committed text.
+            let committedValue = null;
+            const getCommitted = () => {{
+                if (committedValue === null) {{
+                    const target = findTextarea();
+                    committedValue = target ? target.value : '';
+                }}
+                return committedValue;
+            }};
+
+            const appendCommitted = (delta) => {{
+                const base = getCommitted();
+                const separator = base && delta && !/\\s$/.test(base) && !/^\\s/.test(delta) ? ' ' : '';
+                committedValue = base + separator + delta;
+                return committedValue;
+            }};
 
             const lockTextarea = () => {{
                 const target = findTextarea();
@@ -517,40 +646,229 @@ def practice_session(standalone: bool = True):
                 enforceAudioOnly();
             }}
 
-            window.addEventListener('message', (event) => {{
-                if (event?.data?.type === 'timer-lock' && event.data.index === {st.session_state.current_question_index}) {{
+            // One window listener for the whole session; each injection just swaps
+            // the handler it forwards to, so listeners don't pile up across reruns
+            if (!window.__practice_listener_installed) {{
+                window.__practice_listener_installed = true;
+                window.addEventListener('message', (event) => {{
+                    if (window.__practice_message_handler) window.__practice_message_handler(event);
+                }});
+            }}
+            window.__practice_message_handler = (event) => {{
+                if (event?.data?.type === 'timer-lock' && event.data.index === {current_index}) {{
                     lockTextarea();
                 }}
-                if (event?.data?.type === 'audio-transcript' && event.data.targetId === containerId) {{
-                    syncValue(event.data.value || '');
+                if (event?.data?.targetId !== containerId) return;
+                if (event.data.type === 'audio-transcript') {{
+                    committedValue = event.data.value || '';
+                    syncValue(committedValue);
+                    enforceAudioOnly();
+                }} else if (event.data.type === 'audio-transcript-delta') {{
+                    syncValue(appendCommitted(event.data.value || ''));
                     enforceAudioOnly();
+                }} else if (event.data.type === 'audio-transcript-interim') {{
+                    const interim = event.data.value || '';
+                    const base = getCommitted();
+                    syncValueSoon(interim ? base + (base && !/\\s$/.test(base) ? ' ' : '') + interim : base);
                 }}
-            }});
+            }};
         }})();
         </script>
-        """,
-        unsafe_allow_html=True,
+        """
     )
-    if current_locked:
-        st.info("✋ Time is up for this question. Use navigation to move on.")
+
+
+def practice_session(standalone: bool = True):
+    if standalone:
+        st.set_page_config(
+            page_title="Practice Session",
+            page_icon="🎤",
+            layout="centered"
+        )
+    state = st.session_state
+    
+    # Initialize session state variables if they don't exist
+    for key, default in _REQUIRED_STATE_ITEMS:
+        if key not in state:
+            state[key] = default() if callable(default) else default
+    
+    st.markdown(_PRACTICE_CSS, unsafe_allow_html=True)
+    
+    # Get parameters from query or use defaults
+    qp = st.query_params
+    role = qp.get("role", "Software Engineer")
+    company = qp.get("company", "a tech company")
+    round_type = qp.get("round", "Coding")
+    difficulty = qp.get("difficulty", "Professional")
+    round_key = round_type.lower()
+    difficulty_key = difficulty.lower()
+    
+    # Header
+    col1, col2 = st.columns([5, 1])
+    with col1:
+        st.title("Practice Session")
+        st.caption(f"{round_type} • {difficulty} Level")
+    
+    # Coding rounds should NOT use audio - they need text input for code
+    is_coding_round = round_key == "coding"
+    if "audio_checkbox" not in state:
+        default_audio = state.get("audio_mode_enabled")
+        if default_audio is None:
+            # Disable audio for coding rounds, enable for others by default
+            default_audio = False if is_coding_round else True
+        state.audio_checkbox = bool(default_audio)
+
+    # Generate questions if we don't have any yet
+    if not state.questions:
+        # Resolve API key (session first, then environment)
+        api_key = state.get('google_api_key') or _env_api_key()
+        
+        # Create a container for the loading message
+        loading_placeholder = st.empty()
+        
+        batch_args = (
+            role,
+            company,
+            round_type,
+            difficulty,
+            state.get('prompt_strategy', 'chain_of_thought'),
+            state.generation_config,
+            state.safety_settings,
+        )
+        key_fingerprint = api_key_fingerprint(api_key or "")
+        batch_seed = state.get('question_batch_seed', 0)
+        batch = _question_batch(*batch_args, batch_seed, key_fingerprint)
+        if batch.error is not None:
+            # Don't hand out a batch that failed part-way. It is shared, so it is
+            # left as is for any session still reading it; this session moves
+            # on to a fresh one.
+            state.question_batch_seed = batch_seed + 1
+            batch = _question_batch(*batch_args, batch_seed + 1, key_fingerprint)
+        
+        try:
+            # Show initial loading message
+            with loading_placeholder.container():
+                st.info("🔄 Preparing your interview questions...")
+            
+            _start_question_batch(
+                batch,
+                dict(
+                    role=role,
+                    company=company,
+                    round_type=round_type,
+                    difficulty=difficulty,
+                    api_key=api_key,
+                    generation_config=state.generation_config,
+                    safety_settings=state.safety_settings,
+                    prompt_strategy=state.get('prompt_strategy', 'chain_of_thought'),
+                ),
+                loading_placeholder,
+            )
+            
+            # The first question is enough to start; the rest are picked up
+            # by _sync_pending_questions as they arrive
+            state.questions = list(batch.questions)
+            state.question_batch = batch
+            
+            # Clear the loading message
+            loading_placeholder.empty()
+            
+            # Rerun to show the first question
+            st.rerun()
+            
+        except Exception as e:
+            loading_placeholder.empty()
+            _report_generation_error(e)
+            state.questions = []  # Reset questions
+            st.stop()
+            
+        state.question_timers = {}
+
+    per_question_seconds = (
+        _TIMER_SECONDS.get((round_key, difficulty_key))
+        or _TIMER_SECONDS.get((round_key, "*"))
+        or _TIMER_SECONDS.get(("*", difficulty_key), 5 * 60)
+    )
+
+    # While a batch is attached the interview has QUESTION_COUNT questions, even
+    # if only n have loaded; "Continue with n questions" detaches it
+    batch = state.get('question_batch')
+    if batch is not None and len(batch.questions) > len(state.questions):
+        # Questions that landed since the last poll
+        state.questions = list(batch.questions)
+    cur = state.current_question_index
+    n = len(state.questions)
+    total = QUESTION_COUNT if batch is not None else n
+    interview_finished = state.get('finished', False)
+    if interview_finished:
+        state.audio_mode_enabled = False
+        state.audio_checkbox = False
+        answers = state.answers
+        answers.update(
+            {idx: state.get(f"answer_input_{idx}", answers.get(idx, "")) for idx in range(n)}
+        )
+        st.markdown(_FINISHED_BANNER_HTML, unsafe_allow_html=True)
+        display_interview_summary(state.questions, answers)
+
+        st.write("### Overall Feedback")
+        response_lengths = [len(answers.get(i, "")) for i in range(n)]
+        avg_response_length = sum(response_lengths) / len(response_lengths) if response_lengths else 0
+        feedback = (
+            ["✅ You completed all the interview questions!"]
+            + (["🔧 Consider providing more detailed answers with specific examples."] if avg_response_length < 100 else [])
+            + list(_ROLE_FEEDBACK.get(role.lower(), _DEFAULT_FEEDBACK))
+        )
+        for item in feedback:
+            st.write(f"- {item}")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("🔄 Start New Interview", use_container_width=True):
+                # A new interview should get new questions, not the cached batch
+                state.question_batch_seed = state.get('question_batch_seed', 0) + 1
+                for key in state.keys() - _PERSIST_KEYS:
+                    state.pop(key, None)
+                st.rerun()
+        with col2:
+            if st.button("🏠 Back to Setup", use_container_width=True):
+                qp.clear()
+                # Like "Start New Interview": the same setup again gets new questions
+                batch_seed = state.get('question_batch_seed', 0) + 1
+                state.clear()
+                state.question_batch_seed = batch_seed
+                st.rerun()
+
+        return
+
+    # Get current question with safety check
+    if cur >= n:
+        st.error("No questions available. Please check your settings and try again.")
+        return
+
+    _render_current_question(per_question_seconds, is_coding_round, total)
+
+    if n < total:
+        if batch.pending:
+            _sync_pending_questions(batch)
+        else:
+            _offer_missing_questions(batch)
     
-    # Handle navigation buttons
+    # Handle navigation buttons; Next and Finish wait for the next question to load
     prev_clicked, next_clicked, new_question_clicked, finish_clicked = display_navigation_buttons(
-        st.session_state.current_question_index,
-        len(st.session_state.questions)
+        cur, total, loaded_questions=n
     )
     
     # Handle button actions
     if prev_clicked:
-        st.session_state.current_question_index -= 1
+        state.current_question_index = cur - 1
         st.rerun()
     elif next_clicked:
-        st.session_state.current_question_index += 1
+        state.current_question_index = cur + 1
         st.rerun()
     elif finish_clicked:
-        st.session_state.finished = True
-        st.session_state.audio_mode_enabled = False
-        st.session_state.audio_checkbox = False
+        state.finished = True
+        state.audio_mode_enabled = False
+        state.audio_checkbox = False
         st.rerun()
 
 if __name__ == "__main__":
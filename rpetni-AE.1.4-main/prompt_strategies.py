@@ -1,41 +1,25 @@
-from typing import Optional
+import functools
+from typing import Optional, Sequence, Tuple, Union
 
+# Previous questions, either as a sequence or already formatted as a bulleted
+# list (see extend_prior_list)
+PriorQuestions = Union[Sequence[str], str, None]
+# (question number, question count), for questions generated side by side
+QuestionSlot = Optional[Tuple[int, int]]
 
-def zero_shot_prompt(
-    role: str,
-    company: str,
-    round_type: str,
-    difficulty: str,
-    previous_questions: Optional[list] = None,
-) -> str:
-    prior_list = "\n".join(f"- {q}" for q in (previous_questions or [])) or "None"
-    
-    return f"""Generate a single interview question for the following position:
+# Every strategy prompt is split in two: a static instruction block that only
+# depends on the strategy (and, for few-shot, the round type), followed by a
+# short block with the position details and previously asked questions. Keeping
+# the static part first lets the model provider reuse it across requests.
 
-Role: {role}
-Company: {company or 'a company'}
-Interview Round: {round_type}
-Difficulty Level: {difficulty}
-
-Previously asked questions (avoid repetition):
-{prior_list}
+_ZERO_SHOT_PREFIX = """Generate a single interview question for the position described below.
 
-Generate exactly ONE challenging and relevant interview question.
+Avoid repeating any of the previously asked questions listed with it.
 
-Question:"""
+Generate exactly ONE challenging and relevant interview question."""
 
-
-def few_shot_prompt(
-    role: str,
-    company: str,
-    round_type: str,
-    difficulty: str,
-    previous_questions: Optional[list] = None,
-) -> str:
-    prior_list = "\n".join(f"- {q}" for q in (previous_questions or [])) or "None"
-    
-    if round_type.lower() == "coding":
-        examples = """
+_FEW_SHOT_EXAMPLES = {
+    "coding": """
 Example 1:
 Role: Software Engineer
 Question: "Implement a function to find the longest palindromic substring in a given string. What's the time complexity of your solution?"
@@ -47,9 +31,8 @@ Question: "Design a rate limiter for an API that handles 10,000 requests per sec
 Example 3:
 Role: Full Stack Developer
 Question: "How would you optimize a slow database query that joins three tables with millions of rows each?"
-"""
-    elif round_type.lower() == "behavioral":
-        examples = """
+""",
+    "behavioral": """
 Example 1:
 Role: Product Manager
 Question: "Tell me about a time when you had to make a difficult decision with incomplete information. How did you approach it?"
@@ -61,9 +44,8 @@ Question: "Describe a situation where you had to give constructive feedback to a
 Example 3:
 Role: Software Engineer
 Question: "Can you share an example of when you disagreed with your manager's technical decision? How did you handle it?"
-"""
-    else:
-        examples = """
+""",
+    "_default": """
 Example 1:
 Role: Data Scientist
 Question: "Explain the bias-variance tradeoff and how it impacts model selection in machine learning."
@@ -75,80 +57,46 @@ Question: "How would you design a CI/CD pipeline for a microservices architectur
 Example 3:
 Role: Security Engineer
 Question: "What are the key differences between symmetric and asymmetric encryption, and when would you use each?"
-"""
-    
-    return f"""Here are examples of high-quality interview questions:
-{examples}
-
-Now generate a similar question for:
-Role: {role}
-Company: {company or 'a company'}
-Interview Round: {round_type}
-Difficulty Level: {difficulty}
-
-Previously asked questions (avoid these):
-{prior_list}
+""",
+}
 
-Generate exactly ONE interview question following the style and quality of the examples above.
+_FEW_SHOT_PREFIX = """Here are examples of high-quality interview questions:
+{examples}
 
-Question:"""
+Now generate a similar question for the position described below, avoiding the previously asked questions listed with it.
 
+Generate exactly ONE interview question following the style and quality of the examples above."""
+_FEW_SHOT_PREFIXES = {
+    round_key: _FEW_SHOT_PREFIX.format(examples=examples)
+    for round_key, examples in _FEW_SHOT_EXAMPLES.items()
+}
 
-def chain_of_thought_prompt(
-    role: str,
-    company: str,
-    round_type: str,
-    difficulty: str,
-    previous_questions: Optional[list] = None,
-) -> str:
-    prior_list = "\n".join(f"- {q}" for q in (previous_questions or [])) or "None"
-    
-    return f"""You need to generate an interview question. Let's think through this step by step:
+_CHAIN_OF_THOUGHT_PREFIX = """You need to generate an interview question for the position described below. Let's think through this step by step:
 
 Step 1: Analyze the role and requirements
-- Role: {role}
-- Company: {company or 'a company'}
-- Interview Round: {round_type}
-- Difficulty Level: {difficulty}
+- Role, company, interview round and difficulty level are given below
 
 Step 2: Consider what skills are most important for this role
-Think about: What are the key competencies needed for a {role}?
+Think about: What are the key competencies needed for this role?
 
 Step 3: Determine the appropriate question type
-For {round_type} round at {difficulty} level, what type of question would best assess the candidate?
+For this interview round at this difficulty level, what type of question would best assess the candidate?
 
 Step 4: Review previously asked questions to avoid repetition
-{prior_list}
+- They are listed after the position details
 
 Step 5: Craft a question that:
 - Tests relevant skills for the role
 - Matches the difficulty level
-- Is appropriate for the {round_type} round
+- Is appropriate for the interview round
 - Doesn't repeat previous questions
 - Encourages detailed, thoughtful responses
 
-Now, based on this reasoning, generate exactly ONE interview question:
+Now, based on this reasoning, generate exactly ONE interview question."""
 
-Question:"""
+_ROLE_BASED_PREFIX = """You are a senior technical recruiter with 15+ years of experience at top tech companies like Google, Meta, and Amazon. You've conducted over 5,000 interviews and have deep expertise in assessing candidates for technical roles.
 
-
-def role_based_prompt(
-    role: str,
-    company: str,
-    round_type: str,
-    difficulty: str,
-    previous_questions: Optional[list] = None,
-) -> str:
-    prior_list = "\n".join(f"- {q}" for q in (previous_questions or [])) or "None"
-    
-    return f"""You are a senior technical recruiter with 15+ years of experience at top tech companies like Google, Meta, and Amazon. You've conducted over 5,000 interviews and have deep expertise in assessing candidates for technical roles.
-
-Your task is to create an interview question that will effectively evaluate a candidate applying for:
-
-Position: {role}
-Company: {company or 'a company'}
-Interview Stage: {round_type}
-Candidate Level: {difficulty}
+Your task is to create an interview question that will effectively evaluate a candidate applying for the position described below.
 
 As an expert interviewer, you know that great questions should:
 - Reveal the candidate's depth of knowledge
@@ -157,37 +105,18 @@ As an expert interviewer, you know that great questions should:
 - Be fair and unbiased
 - Relate to real-world scenarios
 
-Questions already asked in this interview (avoid similar topics):
-{prior_list}
-
-Drawing on your extensive experience, craft exactly ONE interview question that will help identify the best candidate for this role.
+Avoid topics similar to the questions already asked in this interview, which are listed with the position.
 
-Question:"""
-
-
-def structured_output_prompt(
-    role: str,
-    company: str,
-    round_type: str,
-    difficulty: str,
-    previous_questions: Optional[list] = None,
-) -> str:
-    prior_list = "\n".join(f"- {q}" for q in (previous_questions or [])) or "None"
-    
-    return f"""Generate an interview question with the following specifications:
+Drawing on your extensive experience, craft exactly ONE interview question that will help identify the best candidate for this role."""
 
-TARGET ROLE: {role}
-COMPANY: {company or 'a company'}
-INTERVIEW ROUND: {round_type}
-DIFFICULTY: {difficulty}
+_STRUCTURED_OUTPUT_PREFIX = """Generate an interview question for the position specified below.
 
 REQUIREMENTS:
-1. The question must be relevant to the {role} position
-2. It should match the {difficulty} difficulty level
-3. It must be appropriate for the {round_type} interview round
+1. The question must be relevant to the target role
+2. It should match the given difficulty level
+3. It must be appropriate for the given interview round
 4. It should encourage detailed responses (not yes/no questions)
-5. It must be different from these previously asked questions:
-{prior_list}
+5. It must be different from the previously asked questions listed below
 
 QUALITY CRITERIA:
 - Clarity: The question should be unambiguous
@@ -199,54 +128,117 @@ OUTPUT FORMAT:
 Provide only the interview question, nothing else. The question should be:
 - One clear, focused question (may include follow-up parts)
 - Properly punctuated
-- Professional in tone
+- Professional in tone"""
 
-Question:"""
+_SOCRATIC_PREFIX = """Let's create an excellent interview question by answering these guiding questions about the position described below:
 
+Q1: What is the role we're interviewing for?
+Q2: What are the core competencies required for this role?
+    [Consider technical skills, soft skills, and domain knowledge]
+Q3: What interview round is this?
+Q4: What specific skills should this round assess?
+    [Think about what this round uniquely evaluates]
+Q5: What difficulty level are we targeting?
+Q6: How should questions differ between difficulty levels?
+    [Consider complexity, depth, and expected experience]
+Q7: What questions have already been asked?
+Q8: What topics or skills haven't been covered yet?
+    [Identify gaps in the interview coverage]
+Q9: What real-world challenges does someone in this role at this company face?
+    [Think about practical, job-relevant scenarios]
+Q10: Based on all these considerations, what single question would best assess the candidate?
 
-def socratic_prompt(
-    role: str,
-    company: str,
-    round_type: str,
-    difficulty: str,
-    previous_questions: Optional[list] = None,
-) -> str:
-    prior_list = "\n".join(f"- {q}" for q in (previous_questions or [])) or "None"
-    
-    return f"""Let's create an excellent interview question by answering these guiding questions:
+Generate exactly ONE interview question."""
 
-Q1: What is the role we're interviewing for?
-A1: {role}
+# The per-request part, shared by every strategy
+_DETAILS_TMPL = """---
+Role: {role}
+Company: {company}
+Interview Round: {round_type}
+Difficulty Level: {difficulty}
 
-Q2: What are the core competencies required for a {role}?
-A2: [Consider technical skills, soft skills, and domain knowledge]
+Previously asked questions (avoid these):
+{prior_list}
+{slot_note}
+Question:"""
 
-Q3: What interview round is this?
-A3: {round_type}
+# Questions requested at the same time can't see each other, so each is told
+# its place in the interview and asked to pick its own topic
+_SLOT_NOTE_TMPL = """
+This is question {number} of {total} in this interview. The other questions are written at the same time, so cover a different topic or skill than they are likely to.
+"""
 
-Q4: What specific skills should the {round_type} round assess?
-A4: [Think about what this round uniquely evaluates]
 
-Q5: What difficulty level are we targeting?
-A5: {difficulty}
+def _format_prior(previous_questions: PriorQuestions) -> str:
+    if isinstance(previous_questions, str):
+        return previous_questions or "None"
+    return "\n".join(f"- {q}" for q in (previous_questions or [])) or "None"
 
-Q6: How should questions differ between difficulty levels?
-A6: [Consider complexity, depth, and expected experience]
 
-Q7: What questions have already been asked?
-A7: {prior_list}
+def extend_prior_list(prior_list: str, question: str) -> str:
+    """Append one question to an already formatted previous-questions list.
 
-Q8: What topics or skills haven't been covered yet?
-A8: [Identify gaps in the interview coverage]
+    Callers that ask for questions one after another can keep the formatted
+    string around and pass it as previous_questions, instead of having every
+    prompt re-join the whole list.
+    """
+    return f"{prior_list}\n- {question}" if prior_list else f"- {question}"
 
-Q9: What real-world challenges does a {role} at {company or 'a company'} face?
-A9: [Think about practical, job-relevant scenarios]
 
-Q10: Based on all these considerations, what single question would best assess the candidate?
+def _details(
+    role: str,
+    company: str,
+    round_type: str,
+    difficulty: str,
+    previous_questions: PriorQuestions,
+    question_slot: QuestionSlot = None,
+) -> str:
+    return _DETAILS_TMPL.format_map({
+        "role": role,
+        "company": company or 'a company',
+        "round_type": round_type,
+        "difficulty": difficulty,
+        "prior_list": _format_prior(previous_questions),
+        "slot_note": _SLOT_NOTE_TMPL.format(
+            number=question_slot[0], total=question_slot[1]
+        ) if question_slot else "",
+    })
+
+
+# Static prefix per strategy; few-shot has one per round type ("_default" otherwise)
+_PREFIXES: dict[str, Union[str, dict[str, str]]] = {
+    "zero_shot": _ZERO_SHOT_PREFIX,
+    "few_shot": _FEW_SHOT_PREFIXES,
+    "chain_of_thought": _CHAIN_OF_THOUGHT_PREFIX,
+    "role_based": _ROLE_BASED_PREFIX,
+    "structured_output": _STRUCTURED_OUTPUT_PREFIX,
+    "socratic": _SOCRATIC_PREFIX,
+}
 
-Generate exactly ONE interview question:
 
-Question:"""
+def _render(
+    name: str,
+    role: str,
+    company: str,
+    round_type: str,
+    difficulty: str,
+    previous_questions: PriorQuestions = None,
+    question_slot: QuestionSlot = None,
+) -> Tuple[str, str]:
+    prefix = _PREFIXES[name]
+    if not isinstance(prefix, str):
+        prefix = prefix.get(round_type.lower(), prefix["_default"])
+    return prefix, _details(
+        role, company, round_type, difficulty, previous_questions, question_slot
+    )
+
+
+zero_shot_prompt = functools.partial(_render, "zero_shot")
+few_shot_prompt = functools.partial(_render, "few_shot")
+chain_of_thought_prompt = functools.partial(_render, "chain_of_thought")
+role_based_prompt = functools.partial(_render, "role_based")
+structured_output_prompt = functools.partial(_render, "structured_output")
+socratic_prompt = functools.partial(_render, "socratic")
 
 
 # Dictionary mapping strategy names to their functions
@@ -284,22 +276,51 @@ PROMPT_STRATEGIES = {
 }
 
 
+PROMPT_STRATEGIES_FUNCS = {key: info["function"] for key, info in PROMPT_STRATEGIES.items()}
+
+# Lookups for the strategy picker in the setup page
+STRATEGY_NAME_TO_KEY = {info["name"]: key for key, info in PROMPT_STRATEGIES.items()}
+STRATEGY_NAMES = tuple(STRATEGY_NAME_TO_KEY)
+STRATEGY_KEY_INDEX = {key: i for i, key in enumerate(PROMPT_STRATEGIES)}
+
+
 def get_prompt_by_strategy(
     strategy: str,
     role: str,
     company: str,
     round_type: str,
     difficulty: str,
-    previous_questions: Optional[list] = None,
-) -> str:
-    if strategy not in PROMPT_STRATEGIES:
+    previous_questions: PriorQuestions = None,
+    question_slot: QuestionSlot = None,
+) -> Tuple[str, str]:
+    """Return the (static_prefix, dynamic_suffix) prompt pair for a strategy."""
+    if strategy not in PROMPT_STRATEGIES_FUNCS:
         raise ValueError(
             f"Unknown strategy '{strategy}'. "
             f"Available strategies: {', '.join(PROMPT_STRATEGIES.keys())}"
         )
     
-    prompt_function = PROMPT_STRATEGIES[strategy]["function"]
-    return prompt_function(role, company, round_type, difficulty, previous_questions)
+    if not isinstance(previous_questions, str):
+        previous_questions = tuple(previous_questions or ())
+    return _build_prompt(
+        strategy, role, company, round_type, difficulty, previous_questions, question_slot
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _build_prompt(
+    strategy: str,
+    role: str,
+    company: str,
+    round_type: str,
+    difficulty: str,
+    previous_questions: Union[Tuple[str, ...], str],
+    question_slot: QuestionSlot = None,
+) -> Tuple[str, str]:
+    prompt_function = PROMPT_STRATEGIES_FUNCS[strategy]
+    return prompt_function(
+        role, company, round_type, difficulty, previous_questions, question_slot
+    )
 
 
 def get_available_strategies() -> dict:
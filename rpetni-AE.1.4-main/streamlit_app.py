@@ -1,45 +1,68 @@
+import functools
 import os
+import re
 from pathlib import Path
 
 import streamlit as st
-from dotenv import load_dotenv
+from dotenv import dotenv_values, load_dotenv
 
 from interview_flow import handle_practice_navigation
 from llm_utils import (
-    generate_question,
     validate_google_api_key,
     DEFAULT_GENERATION_CONFIG,
     DEFAULT_SAFETY_SETTINGS,
     HarmCategory,
     HarmBlockThreshold,
 )
-from prompt_strategies import get_available_strategies
+from prompt_strategies import (
+    STRATEGY_KEY_INDEX,
+    STRATEGY_NAME_TO_KEY,
+    STRATEGY_NAMES,
+    get_available_strategies,
+)
 
 DOTENV_PATH = Path(__file__).resolve().parent / ".env"
+# Roles that get the Coding round. Plain substring match on purpose, so
+# e.g. "Engineering Manager" still qualifies via "engineer".
+_CODING_ROLE_RE = re.compile(r"developer|engineer|coder|coding|programmer|software", re.IGNORECASE)
+# Safety selectbox label -> threshold, and the categories offered in the UI
+_SAFETY_THRESHOLDS = {
+    "Block None": HarmBlockThreshold.BLOCK_NONE,
+    "Block Few": HarmBlockThreshold.BLOCK_ONLY_HIGH,
+    "Block Some": HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+    "Block Most": HarmBlockThreshold.BLOCK_LOW_AND_ABOVE,
+}
+_SAFETY_THRESHOLD_NAMES = tuple(_SAFETY_THRESHOLDS)
+_SAFETY_CATEGORIES = (
+    ("Harassment", HarmCategory.HARM_CATEGORY_HARASSMENT),
+    ("Hate Speech", HarmCategory.HARM_CATEGORY_HATE_SPEECH),
+    ("Sexually Explicit", HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT),
+    ("Dangerous Content", HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT),
+)
 load_dotenv(dotenv_path=DOTENV_PATH, override=False)
 
+@functools.lru_cache(maxsize=1)
+def _env_file_api_key() -> str | None:
+    # Read .env once per process instead of on every rerun; reload_env_api_key
+    # drops the cached value when the user asks for it. dotenv's own parser
+    # handles "export KEY=...", quoting and comments.
+    value = dotenv_values(DOTENV_PATH).get("GOOGLE_API_KEY")
+    return value or None
+
+
+def reload_env_api_key() -> None:
+    _env_file_api_key.cache_clear()
+    load_dotenv(dotenv_path=DOTENV_PATH, override=True)
+
+
 def get_google_api_key() -> str | None:
     # Check session state first (user-provided API key)
     if 'user_api_key' in st.session_state and st.session_state.user_api_key:
         return st.session_state.user_api_key.strip()
 
-    load_dotenv(dotenv_path=DOTENV_PATH, override=True)
-    key = os.getenv("GOOGLE_API_KEY")
-    if key:
-        return key.strip()
-
-    if DOTENV_PATH.exists():
-        try:
-            with open(DOTENV_PATH, encoding="utf-8") as env_file:
-                for line in env_file:
-                    if line.strip().startswith("GOOGLE_API_KEY="):
-                        _, value = line.split("=", 1)
-                        value = value.strip().strip('"').strip("'")
-                        if value:
-                            return value
-        except OSError:
-            pass
-    return None
+    # .env wins over the shell environment
+    key = _env_file_api_key() or os.environ.get("GOOGLE_API_KEY")
+    return key.strip() if key else None
 
 def set_page_config():
     st.set_page_config(
@@ -51,30 +74,40 @@ def set_page_config():
     apply_app_styles()
 
 
-def apply_app_styles() -> None:
+@st.cache_resource(show_spinner=False)
+def _load_css() -> str:
     styles_path = Path(__file__).resolve().parent / "styles.css"
-    if styles_path.exists():
-        with open(styles_path, encoding="utf-8") as css_file:
-            st.markdown(f"<style>{css_file.read()}</style>", unsafe_allow_html=True)
+    if not styles_path.exists():
+        return ""
+    return f"<style>{styles_path.read_text(encoding='utf-8')}</style>"
+
+
+def apply_app_styles() -> None:
+    css = _load_css()
+    if css:
+        st.markdown(css, unsafe_allow_html=True)
     else:
         st.warning("styles.css file is missing. UI may not render as expected.")
 
 def main():
     set_page_config()
+    ss = st.session_state
     
     # Initialize session state for role and company if not exists
-    if 'role' not in st.session_state:
-        st.session_state.role = ""
-    if 'company' not in st.session_state:
-        st.session_state.company = ""
-    if 'user_api_key' not in st.session_state:
-        st.session_state.user_api_key = ""
+    if 'role' not in ss:
+        ss.role = ""
+    if 'company' not in ss:
+        ss.company = ""
+    if 'user_api_key' not in ss:
+        ss.user_api_key = ""
+    role = ss.role
+    company = ss.company
 
     practice_mode_active = handle_practice_navigation()
 
     # Defaults when practice session is already running
     api_key_validation_error: str | None = None
-    role_provided = bool(st.session_state.role.strip())
+    role_provided = bool(role.strip())
     api_key_available = False
 
     if not practice_mode_active:
@@ -84,14 +117,14 @@ def main():
 
         user_api_key = st.text_input(
             "Paste your Google API Key here",
-            value=st.session_state.user_api_key,
+            value=ss.user_api_key,
             type="password",
             placeholder="Enter your API key",
             key="api_key_input",
             help="Your API key is only stored in this session and never saved to disk."
         )
         if user_api_key:
-            st.session_state.user_api_key = user_api_key
+            ss.user_api_key = user_api_key
 
         st.markdown("---")
 
@@ -99,42 +132,44 @@ def main():
         col1, col2 = st.columns([5, 1])
         with col1:
             # Role input
-            st.session_state.role = st.text_input(
+            role = st.text_input(
                 "Role", 
-                value=st.session_state.role, 
+                value=role, 
                 label_visibility="collapsed", 
                 placeholder="Enter role (e.g., Full Stack Developer)",
                 key="role_input"
             )
-            st.markdown(f'<div class="job-title">{st.session_state.role}</div>', unsafe_allow_html=True)
+            if role != ss.role:
+                ss.role = role
+            st.markdown(f'<div class="job-title">{role}</div>', unsafe_allow_html=True)
             
             # Company input
-            st.session_state.company = st.text_input(
+            company = st.text_input(
                 "Company", 
-                value=st.session_state.company, 
+                value=company, 
                 label_visibility="collapsed", 
                 placeholder="Enter company name (optional)",
                 key="company_input"
             )
-            if st.session_state.company:
-                st.markdown(f'<div class="company">{st.session_state.company}</div>', unsafe_allow_html=True)
+            if company != ss.company:
+                ss.company = company
+            if company:
+                st.markdown(f'<div class="company">{company}</div>', unsafe_allow_html=True)
         
         # Select Round
         st.markdown('<div class="section-title">Select Round</div>', unsafe_allow_html=True)
-        role_text = st.session_state.role.lower()
-        coding_keywords = ["developer", "engineer", "coder", "coding", "programmer", "software"]
-        coding_round_enabled = any(keyword in role_text for keyword in coding_keywords)
+        coding_round_enabled = bool(_CODING_ROLE_RE.search(role))
 
         if coding_round_enabled:
             rounds = ["Warm Up", "Coding", "Role Related", "Behavioral"]
         else:
             rounds = ["Warm Up", "Role Related", "Behavioral"]
-            if st.session_state.get("round_radio") == "Coding":
-                st.session_state.round_radio = "Warm Up"
+            if ss.get("round_radio") == "Coding":
+                ss.round_radio = "Warm Up"
         st.radio(
             "Select Round", 
             options=rounds, 
-            index=0 if st.session_state.get("round_radio") not in rounds else rounds.index(st.session_state.round_radio), 
+            index=0 if ss.get("round_radio") not in rounds else rounds.index(ss.round_radio), 
             format_func=lambda x: x, 
             key="round_radio", 
             horizontal=True, 
@@ -158,12 +193,12 @@ def main():
         st.markdown('<div class="section-title">Practice Settings</div>', unsafe_allow_html=True)
         col1, = st.columns(1)
         with col1:
-            selected_round = st.session_state.get("round_radio", "Warm Up")
+            selected_round = ss.get("round_radio", "Warm Up")
             # Coding round should NOT use audio mode - it needs text input for code
             audio_disabled_for_coding = selected_round == "Coding"
             if audio_disabled_for_coding:
-                st.session_state.audio_checkbox = False
-                st.session_state.audio_mode_enabled = False
+                ss.audio_checkbox = False
+                ss.audio_mode_enabled = False
                 st.checkbox(
                     "Audio (disabled for Coding)",
                     value=False,
@@ -172,47 +207,43 @@ def main():
                     help="Coding practice requires text input for writing code.",
                 )
             else:
-                current_audio_pref = st.session_state.get("audio_checkbox", True)
+                current_audio_pref = ss.get("audio_checkbox", True)
                 audio_pref = st.checkbox("Audio", value=current_audio_pref, key="audio_checkbox")
-                st.session_state.audio_mode_enabled = audio_pref
+                ss.audio_mode_enabled = audio_pref
 
-        if "generation_config" not in st.session_state:
-            st.session_state.generation_config = DEFAULT_GENERATION_CONFIG.copy()
+        if "generation_config" not in ss:
+            ss.generation_config = DEFAULT_GENERATION_CONFIG.copy()
         else:
             # Update max_output_tokens if it's too low (from old default)
-            if st.session_state.generation_config.get("max_output_tokens", 0) < 1024:
-                st.session_state.generation_config["max_output_tokens"] = DEFAULT_GENERATION_CONFIG["max_output_tokens"]
-        generation_config = st.session_state.generation_config
+            if ss.generation_config.get("max_output_tokens", 0) < 1024:
+                ss.generation_config["max_output_tokens"] = DEFAULT_GENERATION_CONFIG["max_output_tokens"]
+        generation_config = ss.generation_config
 
         # Prompt Strategy Selection
         st.markdown('<div class="section-title">Prompt Strategy</div>', unsafe_allow_html=True)
         st.caption("Choose which prompting technique to use for generating questions")
         
         # Initialize prompt strategy in session state
-        if 'prompt_strategy' not in st.session_state:
-            st.session_state.prompt_strategy = "chain_of_thought"
+        if 'prompt_strategy' not in ss:
+            ss.prompt_strategy = "chain_of_thought"
         
         # Get available strategies
         strategies = get_available_strategies()
-        strategy_options = {
-            strategies[key]["name"]: key 
-            for key in strategies.keys()
-        }
         
         # Create selectbox with strategy names
         selected_strategy_name = st.selectbox(
             "Prompting Technique",
-            options=list(strategy_options.keys()),
-            index=list(strategy_options.values()).index(st.session_state.prompt_strategy),
+            options=STRATEGY_NAMES,
+            index=STRATEGY_KEY_INDEX[ss.prompt_strategy],
             help="Different prompting techniques can produce different quality questions. Experiment to find what works best!",
             key="strategy_selectbox"
         )
         
         # Store the strategy key
-        st.session_state.prompt_strategy = strategy_options[selected_strategy_name]
+        ss.prompt_strategy = STRATEGY_NAME_TO_KEY[selected_strategy_name]
         
         # Show description of selected strategy
-        selected_strategy_info = strategies[st.session_state.prompt_strategy]
+        selected_strategy_info = strategies[ss.prompt_strategy]
         st.info(f"ℹ️ **{selected_strategy_info['name']}**: {selected_strategy_info['description']}")
 
         with st.expander("LLM Generation Settings", expanded=False):
@@ -259,52 +290,38 @@ def main():
         st.markdown("### Content Safety Settings")
         st.caption("Configure content safety filters for generated questions.")
         
-        if 'safety_settings' not in st.session_state:
-            st.session_state.safety_settings = DEFAULT_SAFETY_SETTINGS
+        if 'safety_settings' not in ss:
+            ss.safety_settings = DEFAULT_SAFETY_SETTINGS
             
-        # Safety threshold options mapping
-        safety_thresholds = {
-            "Block None": HarmBlockThreshold.BLOCK_NONE,
-            "Block Few": HarmBlockThreshold.BLOCK_ONLY_HIGH,
-            "Block Some": HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-            "Block Most": HarmBlockThreshold.BLOCK_LOW_AND_ABOVE
-        }
-        
-        # Safety categories to show in UI
-        safety_categories = {
-            "Harassment": HarmCategory.HARM_CATEGORY_HARASSMENT,
-            "Hate Speech": HarmCategory.HARM_CATEGORY_HATE_SPEECH,
-            "Sexually Explicit": HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
-            "Dangerous Content": HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT
-        }
-        
         # Create a column for each safety category
-        cols = st.columns(len(safety_categories))
+        cols = st.columns(len(_SAFETY_CATEGORIES))
         
-        for i, (category_name, category) in enumerate(safety_categories.items()):
-            with cols[i % len(cols)]:
+        safety = dict(ss.safety_settings)
+        for col, (category_name, category) in zip(cols, _SAFETY_CATEGORIES):
+            with col:
                 threshold = st.selectbox(
                     category_name,
-                    options=list(safety_thresholds.keys()),
+                    options=_SAFETY_THRESHOLD_NAMES,
                     index=2,  # Default to "Block Some"
                     key=f"safety_{category_name}",
                     help=f"Safety threshold for {category_name.lower()} content"
                 )
-                st.session_state.safety_settings[category] = safety_thresholds[threshold]
+            safety[category] = _SAFETY_THRESHOLDS[threshold]
+        ss.safety_settings = safety
         
         api_key = get_google_api_key()
         if api_key:
-            cached_key = st.session_state.get("validated_api_key")
             try:
-                if cached_key != api_key:
-                    validate_google_api_key(
+                # Successful validations are cached per key for an hour inside
+                # llm_utils, so reruns only hit the API once per key
+                validate_google_api_key(
                     api_key,
-                    generation_config=st.session_state.generation_config,
-                    safety_settings=st.session_state.safety_settings,
+                    generation_config=generation_config,
+                    safety_settings=safety,
                 )
-                    st.session_state.validated_api_key = api_key
+                ss.validated_api_key = api_key
                 st.success("API key loaded from environment (.env file or shell). You're ready to call external services.")
-                st.session_state.google_api_key = api_key
+                ss.google_api_key = api_key
             except Exception as exc: 
                 api_key_validation_error = str(exc)
                 api_key = None
@@ -313,12 +330,15 @@ def main():
             # Only show API key instructions when a key isn't available yet
             st.markdown('### API Key')
             st.markdown('You need a Google API key to generate interview questions. Get one from [Google AI Studio](https://aistudio.google.com/app/apikey)')
-            st.error("No API key detected. Create a .env file with GOOGLE_API_KEY=your-key, then restart the app.")
+            st.error("No API key detected. Create a .env file with GOOGLE_API_KEY=your-key, then reload it.")
+            if st.button("🔄 Reload .env", key="reload_env"):
+                reload_env_api_key()
+                st.rerun()
         
         # No API key needed anymore - using local questions
         st.info("ℹ️ Practice with automatically generated questions")
         
-        role_provided = bool(st.session_state.role.strip())
+        role_provided = bool(role.strip())
         api_key_available = bool(api_key)
 
     # Action Buttons
@@ -354,7 +374,7 @@ def main():
         if role_provided and api_key_validation_error:
             warning_messages.append("Your Google API key appears invalid. Update it in .env and restart before generating questions.")
         if role_provided and api_key_available:
-            st.session_state.start_practice = True
+            ss.start_practice = True
             handle_practice_navigation()
             st.rerun()
 
@@ -1,35 +1,89 @@
+import functools
+import html
+import io
+from typing import Final
+
 import streamlit as st
 
+# Accessible label of the answer text area
+_ANSWER_LABEL_PREFIX = "Answer for question "
+
+# Navigation button labels
+_PREV_LABEL: Final = "⏮️ Previous"
+_NEXT_LABEL: Final = "Next ⏭️"
+_NEW_QUESTION_LABEL: Final = "🔀 New Question"
+_FINISH_LABEL: Final = "✅ Finish Interview"
+
+# Question box styled to match the countdown's dimensions
+_QUESTION_BOX_TEMPLATE = (
+    '<div class="question-box" style="display:flex;flex-direction:column;gap:2px;'
+    'align-items:center;justify-content:center;padding:8px 12px;border:1px solid #e5e7eb;'
+    'border-radius:8px;background:#fff;box-shadow:0 2px 4px rgba(0,0,0,0.05);'
+    "font-family:'Source Sans Pro','Segoe UI',system-ui;margin:1rem 0;min-width:100px;\">"
+    '<div style="font-size:0.9rem;color:#6b7280;">Question {n} of {total}</div>'
+    '<div style="font-size:1.1rem;font-weight:600;color:#333333;text-align:center;">{question}</div>'
+    '</div>'
+)
+
+# Hides the answer text area in audio mode, via the class of the keyed
+# container it is wrapped in (see display_response_area). One selector covers
+# every index. It is still sent on each hidden rerun: Streamlit drops elements
+# a rerun doesn't emit again, but an unchanged style block is left alone by
+# the frontend.
+_HIDDEN_TEXTAREA_CSS = """
+            <style>
+                [class*="st-key-hidden-answer-"] {
+                    display: none !important;
+                }
+                .sr-only-response {
+                    position: absolute;
+                    width: 1px;
+                    height: 1px;
+                    padding: 0;
+                    margin: -1px;
+                    overflow: hidden;
+                    clip: rect(0, 0, 0, 0);
+                    white-space: nowrap;
+                    border: 0;
+                }
+            </style>
+            """
+_HIDDEN_RESPONSE_HTML = (
+    '<div class="sr-only-response" aria-live="polite">Audio mode is active; text input is hidden.</div>'
+    + _HIDDEN_TEXTAREA_CSS
+)
+
+# Summary entries rendered as plain HTML, styled after st.expander. Questions
+# and answers are escaped and their newlines turned into <br> so no blank line
+# ends the HTML block early in the markdown renderer.
+_SUMMARY_CSS = (
+    '<style>'
+    '.summary-item{border:1px solid rgba(49,51,63,0.2);border-radius:0.5rem;'
+    'padding:0.5rem 1rem;margin-bottom:0.5rem}'
+    '.summary-item summary{cursor:pointer}'
+    '.summary-answer{margin-top:0.5rem}'
+    '.summary-more{display:inline}'
+    '.summary-more summary{display:inline;cursor:pointer;color:#6366f1}'
+    '.summary-more[open] summary{display:none}'
+    '</style>'
+)
+# Longer answers show this many characters; the rest sits behind a toggle
+_ANSWER_PREVIEW_CHARS = 2000
+_SUMMARY_ITEM_TEMPLATE = (
+    '<details class="summary-item"><summary>Question {n}: {question}</summary>'
+    '<div class="summary-answer">{answer}</div></details>'
+)
+
+@functools.lru_cache(maxsize=256)
 def get_response_aria_label(question_index: int) -> str:
-    return f"Answer for question {question_index + 1}"
+    return _ANSWER_LABEL_PREFIX + str(question_index + 1)
 
 def display_question(question: str, current_index: int, total_questions: int) -> None:
-
-    # Display question counter and current question
-    st.markdown(f"**Question {current_index + 1} of {total_questions}**")
-    
-    # Display the question in a styled box matching countdown dimensions
+    # The box already carries the "Question X of Y" counter
     st.markdown(
-        f'''
-        <div class="question-box" style="
-            display: flex;
-            flex-direction: column;
-            gap: 2px;
-            align-items: center;
-            justify-content: center;
-            padding: 8px 12px;
-            border: 1px solid #e5e7eb;
-            border-radius: 8px;
-            background: #fff;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-            font-family: 'Source Sans Pro', 'Segoe UI', system-ui;
-            margin: 1rem 0;
-            min-width: 100px;
-        ">
-            <div style="font-size: 0.9rem; color: #6b7280;">Question {current_index + 1} of {total_questions}</div>
-            <div style="font-size: 1.1rem; font-weight: 600; color: #333333; text-align: center;">{question}</div>
-        </div>
-        ''',
+        _QUESTION_BOX_TEMPLATE.format(
+            n=current_index + 1, total=total_questions, question=_text_html(question)
+        ),
         unsafe_allow_html=True
     )
 
@@ -43,110 +97,148 @@ def display_response_area(
     aria_label = get_response_aria_label(question_index)
     widget_key = f"answer_input_{question_index}"
     
-    # Only show the response header when not hidden
-    if not hidden:
-        st.markdown("### Your Response")
-    
-    # Add a hidden indicator for screen readers when in audio mode
+    # Show the response header, or in audio mode a screen reader notice plus
+    # the CSS that hides the text area, as a single element
     if hidden:
-        st.markdown(
-            '<div class="sr-only-response" aria-live="polite">Audio mode is active; text input is hidden.</div>',
-            unsafe_allow_html=True,
-        )
+        st.markdown(_HIDDEN_RESPONSE_HTML, unsafe_allow_html=True)
+    else:
+        st.markdown("### Your Response")
     
+    # Seed the widget state once; passing value= on every rerun would make
+    # Streamlit reconcile it against the session state each time
+    state = st.session_state
+    if widget_key not in state:
+        state[widget_key] = current_answer
+
     # Create the text area with a valid height
-    # We'll hide it completely with CSS if needed
-    response = st.text_area(
-        aria_label,
-        value=current_answer,
-        height=200,  # Always use a valid height
-        key=widget_key,
-        label_visibility="collapsed",
-        placeholder="Type your answer here..." if not hidden else "",
-        disabled=disabled or hidden,
-    )
-    
-    # Apply CSS to hide the text area when in audio mode
-    if hidden:
-        st.markdown(
-            f"""
-            <style>
-                [data-testid="stTextArea"][aria-label="{aria_label}"] {{
-                    display: none !important;
-                }}
-                textarea[aria-label="{aria_label}"] {{
-                    display: none !important;
-                }}
-                .sr-only-response {{
-                    position: absolute;
-                    width: 1px;
-                    height: 1px;
-                    padding: 0;
-                    margin: -1px;
-                    overflow: hidden;
-                    clip: rect(0, 0, 0, 0);
-                    white-space: nowrap;
-                    border: 0;
-                }}
-            </style>
-            """,
-            unsafe_allow_html=True,
+    # We'll hide it completely with CSS if needed. It has to exist even then:
+    # in audio mode the transcript reaches the session by being written into
+    # this text area from the page (see practice_app's answer sync script).
+    area = st.container(key=f"hidden-answer-{question_index}") if hidden else st.container()
+    with area:
+        response = st.text_area(
+            aria_label,
+            height=200,  # Always use a valid height
+            key=widget_key,
+            label_visibility="collapsed",
+            placeholder="Type your answer here..." if not hidden else "",
+            disabled=disabled or hidden,
         )
 
     return response
 
-def display_navigation_buttons(current_index: int, total_questions: int) -> tuple[bool, bool, bool, bool]:
-   
+def display_navigation_buttons(
+    current_index: int,
+    total_questions: int,
+    *,
+    loaded_questions: int | None = None,
+) -> tuple[bool, bool, bool, bool]:
+    # loaded_questions: how many of the total are available yet (all by default);
+    # Next stays disabled until the following question has loaded
+    is_first = current_index == 0
+    is_last = current_index >= total_questions - 1
+    if loaded_questions is None:
+        loaded_questions = total_questions
+    next_loaded = current_index + 1 < loaded_questions
     col1, col2, col3 = st.columns([1, 1, 2])
     prev_clicked = next_clicked = new_question_clicked = finish_clicked = False
     
+    # Fixed keys keep each button the same widget from one question to the next
     with col1:
         prev_clicked = st.button(
-            "⏮️ Previous",
-            disabled=current_index == 0,
+            _PREV_LABEL,
+            key="nav_prev",
+            disabled=is_first,
             use_container_width=True
         )
     
     with col2:
         next_clicked = st.button(
-            "Next ⏭️",
-            disabled=current_index >= total_questions - 1,
+            _NEXT_LABEL,
+            key="nav_next",
+            disabled=is_last or not next_loaded,
             use_container_width=True
         )
     
     with col3:
-        if current_index < total_questions - 1:
+        if not is_last:
             new_question_clicked = st.button(
-                "🔀 New Question",
+                _NEW_QUESTION_LABEL,
+                key="nav_new",
                 use_container_width=True
             )
         else:
             finish_clicked = st.button(
-                "✅ Finish Interview",
+                _FINISH_LABEL,
+                key="nav_finish",
                 type="primary",
+                disabled=loaded_questions < total_questions,
                 use_container_width=True
             )
     
     return prev_clicked, next_clicked, new_question_clicked, finish_clicked
 
+@st.cache_data(show_spinner=False, max_entries=32)
+def _build_download_blob(
+    questions: tuple[str, ...], answers_items: tuple[tuple[int, str], ...]
+) -> bytes:
+    # Encoded here so the download button gets ready-made bytes on each render
+    answers = dict(answers_items)
+    buf = io.StringIO()
+    write = buf.write
+    for i, q in enumerate(questions):
+        if i:
+            write("\n\n")
+        write("Question ")
+        write(str(i + 1))
+        write(": ")
+        write(q)
+        write("\nAnswer: ")
+        write(answers.get(i, "No response"))
+    return buf.getvalue().encode("utf-8")
+
+def _text_html(text: str) -> str:
+    # Escaped, newlines as <br>: safe inside one markdown HTML block
+    return html.escape(text).replace("\n", "<br>")
+
+def _format_answer_html(answer: str) -> str:
+    if not answer:
+        return "<strong>No response provided</strong>"
+    if len(answer) <= _ANSWER_PREVIEW_CHARS:
+        return "<strong>Your Answer:</strong><br>" + _text_html(answer)
+    # Opening the toggle hides its label, so the rest reads on from the preview
+    return (
+        "<strong>Your Answer:</strong><br>"
+        + _text_html(answer[:_ANSWER_PREVIEW_CHARS])
+        + '<details class="summary-more"><summary>… Show full answer</summary>'
+        + _text_html(answer[_ANSWER_PREVIEW_CHARS:])
+        + "</details>"
+    )
+
+@functools.lru_cache(maxsize=512)
+def _render_summary_item(index: int, question: str, answer: str) -> str:
+    return _SUMMARY_ITEM_TEMPLATE.format(
+        n=index + 1, question=_text_html(question), answer=_format_answer_html(answer)
+    )
+
 def display_interview_summary(questions: list, answers: dict) -> None:
    
     st.success("🎉 Great job on completing the interview!")
     st.write("### Interview Summary")
     
-    # Show all questions and answers
-    for i, question in enumerate(questions):
-        answer = answers.get(i, "")
-        with st.expander(f"Question {i + 1}: {question}"):
-            st.write(f"**Your Answer:**\n{answer}" if answer else "**No response provided**")
+    # Show all questions and answers as one element; each entry is memoized
+    st.markdown(
+        _SUMMARY_CSS + "".join(
+            _render_summary_item(i, question, answers.get(i, ""))
+            for i, question in enumerate(questions)
+        ),
+        unsafe_allow_html=True,
+    )
     
     # Add download button for the interview
     st.download_button(
         label="📥 Download Interview",
-        data="\n\n".join(
-            f"Question {i+1}: {q}\nAnswer: {answers.get(i, 'No response')}"
-            for i, q in enumerate(questions)
-        ),
+        data=_build_download_blob(tuple(questions), tuple(sorted(answers.items()))),
         file_name="interview_responses.txt",
         mime="text/plain"
     )